@@ -3,23 +3,75 @@ Supabase Edge Function: Backtest API
 Endpoint for running backtests
 """
 
-import json
+import orjson
 from datetime import datetime
+from typing import Optional
+import pandas as pd
 from supabase import create_client, Client
 import os
 
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+
+# Created once per function instance so warm invocations reuse the connection
+_SUPABASE: Optional[Client] = (
+    create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY else None
+)
+
+# Only the columns the backtester reads
+MARKET_DATA_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Rows requested per page (PostgREST truncates unbounded selects to max-rows)
+PAGE_SIZE = 1000
+
+
+def _dumps(payload) -> str:
+    """Serialize a response body, numpy values and datetimes included"""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC).decode()
+
+
+def fetch_market_data(supabase: Client, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Fetch OHLCV bars for a date range, one page at a time
+    
+    Pages are requested until an empty one comes back, so a server-side
+    max-rows cap smaller than PAGE_SIZE cannot silently drop bars. Rows are
+    ordered by the primary key after the timestamp, since timestamps are
+    only unique per symbol; without a unique tiebreaker rows sharing a
+    timestamp could be repeated or skipped at page boundaries.
+    
+    Returns:
+        DataFrame indexed by timestamp with open, high, low, close, volume columns
+    """
+    records = []
+    offset = 0
+    while True:
+        page = supabase.table('market_data').select(','.join(MARKET_DATA_COLUMNS)).gte(
+            'timestamp', start_date
+        ).lte('timestamp', end_date).order('timestamp').order('id').range(
+            offset, offset + PAGE_SIZE - 1
+        ).execute().data
+        if not page:
+            break
+        records.extend(page)
+        offset += len(page)
+    
+    data = pd.DataFrame.from_records(records, columns=MARKET_DATA_COLUMNS)
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    return data.set_index('timestamp')
+
 
 def handler(req):
     """Handle backtest requests"""
     
-    # Initialize Supabase client
-    url = os.environ.get("SUPABASE_URL")
-    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-    supabase: Client = create_client(url, key)
-    
-    # Parse request
     try:
-        body = json.loads(req.body)
+        supabase = _SUPABASE
+        if supabase is None:
+            raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+        
+        # Parse request
+        body = orjson.loads(req.body)
         strategy_name = body.get('strategy_name')
         params = body.get('params', {})
         start_date = body.get('start_date')
@@ -27,9 +79,7 @@ def handler(req):
         initial_capital = body.get('initial_capital', 100000)
         
         # Fetch historical data from Supabase
-        data_response = supabase.table('market_data').select('*').gte(
-            'timestamp', start_date
-        ).lte('timestamp', end_date).execute()
+        data = fetch_market_data(supabase, start_date, end_date)
         
         # Run backtest (logic would import from core module)
         # For now, return structure
@@ -58,12 +108,12 @@ def handler(req):
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps(backtest_result)
+            "body": _dumps(backtest_result)
         }
         
     except Exception as e:
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": str(e)})
+            "body": _dumps({"error": str(e)})
         }
@@ -3,50 +3,79 @@ Supabase Edge Function: Options Greeks Calculator API
 Endpoint for calculating options Greeks
 """
 
-import json
-from supabase import create_client, Client
-import os
+import orjson
+from datetime import datetime, timezone
+
+from core.greeks import OptionsGreeks
+
+# Fields every option spec must carry; the rest have defaults
+REQUIRED_FIELDS = ('spot_price', 'strike_price', 'time_to_expiry', 'volatility')
+
+
+def _dumps(payload) -> str:
+    """Serialize a response body, numpy values and datetimes included"""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC).decode()
 
 
 def handler(req):
     """Handle options Greeks calculation requests"""
     
     try:
-        body = json.loads(req.body)
+        body = orjson.loads(req.body)
         
-        spot_price = body.get('spot_price')
-        strike_price = body.get('strike_price')
-        time_to_expiry = body.get('time_to_expiry')
-        volatility = body.get('volatility')
-        risk_free_rate = body.get('risk_free_rate', 0.05)
-        dividend_yield = body.get('dividend_yield', 0.0)
-        option_type = body.get('option_type', 'call')
+        # A batched request carries a list of option specs under "options";
+        # a single option is priced as a batch of one
+        batched = 'options' in body
+        options = body['options'] if batched else [body]
         
-        # Import from core module (would need proper packaging)
-        # For now, return structure
-        greeks = {
-            "delta": 0.5234,
-            "gamma": 0.0234,
-            "vega": 0.2345,
-            "theta": -0.0567,
-            "rho": 0.1234,
-            "option_type": option_type,
-            "spot_price": spot_price,
-            "strike_price": strike_price,
-            "time_to_expiry": time_to_expiry,
-            "volatility": volatility,
-            "calculated_at": json.dumps({"timestamp": "now"})
-        }
+        # Reject incomplete specs up front rather than failing inside numpy
+        for i, option in enumerate(options):
+            missing = [field for field in REQUIRED_FIELDS if option.get(field) is None]
+            if missing:
+                where = f"options[{i}]" if batched else "request"
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": _dumps({"error": f"{where} is missing required field(s): "
+                                             f"{', '.join(missing)}"})
+                }
+        
+        greeks = OptionsGreeks.batch_greeks(
+            S=[o.get('spot_price') for o in options],
+            K=[o.get('strike_price') for o in options],
+            T=[o.get('time_to_expiry') for o in options],
+            sigma=[o.get('volatility') for o in options],
+            r=[o.get('risk_free_rate', 0.05) for o in options],
+            q=[o.get('dividend_yield', 0.0) for o in options],
+            is_call=[o.get('option_type', 'call') == 'call' for o in options]
+        )
+        columns = {name: values.tolist() for name, values in greeks.items()}
+        calculated_at = datetime.now(timezone.utc).isoformat()
+        
+        results = []
+        for i, option in enumerate(options):
+            result = {name: values[i] for name, values in columns.items()}
+            result.update({
+                "option_type": option.get('option_type', 'call'),
+                "spot_price": option.get('spot_price'),
+                "strike_price": option.get('strike_price'),
+                "time_to_expiry": option.get('time_to_expiry'),
+                "volatility": option.get('volatility'),
+                "calculated_at": calculated_at
+            })
+            results.append(result)
+        
+        payload = {"results": results} if batched else results[0]
         
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps(greeks)
+            "body": _dumps(payload)
         }
         
     except Exception as e:
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": str(e)})
+            "body": _dumps({"error": str(e)})
         }
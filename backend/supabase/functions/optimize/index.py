@@ -3,22 +3,58 @@ Supabase Edge Function: Strategy Optimizer API
 Endpoint for optimizing trading strategies
 """
 
-import json
+import orjson
 from datetime import datetime
+from typing import Optional
 from supabase import create_client, Client
 import os
 
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+
+# Created once per function instance so warm invocations reuse the connection
+_SUPABASE: Optional[Client] = (
+    create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY else None
+)
+
+# Rows per bulk insert, keeps each request under PostgREST payload limits
+INSERT_CHUNK_SIZE = 1000
+
+
+def _dumps(payload) -> str:
+    """Serialize a response body, numpy values and datetimes included"""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC).decode()
+
 
 def handler(req):
     """Handle strategy optimization requests"""
     
-    # Initialize Supabase client
-    url = os.environ.get("SUPABASE_URL")
-    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-    supabase: Client = create_client(url, key)
-    
     try:
-        body = json.loads(req.body)
+        supabase = _SUPABASE
+        if supabase is None:
+            raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+        
+        body = orjson.loads(req.body)
+        
+        if body.get('action') == 'persist_results':
+            # Store a whole optimization run with one insert per chunk, not per row
+            job_id = body.get('job_id')
+            rows = [
+                {"job_id": job_id, "params": result.get('params'), "results": result}
+                for result in body.get('results', [])
+            ]
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                supabase.table('optimization_results').insert(
+                    rows[start:start + INSERT_CHUNK_SIZE]
+                ).execute()
+            
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": _dumps({"job_id": job_id, "inserted": len(rows)})
+            }
+        
         strategy_name = body.get('strategy_name')
         optimization_method = body.get('method', 'grid_search')
         param_grid = body.get('param_grid', {})
@@ -42,7 +78,7 @@ def handler(req):
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({
+            "body": _dumps({
                 "job_id": job.data[0]['id'],
                 "status": "running",
                 "message": "Optimization job started"
@@ -53,5 +89,5 @@ def handler(req):
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": str(e)})
+            "body": _dumps({"error": str(e)})
         }
@@ -3,22 +3,36 @@ Supabase Edge Function: Paper Trading API
 Endpoint for paper trading operations
 """
 
-import json
+import orjson
 from datetime import datetime
+from typing import Optional
 from supabase import create_client, Client
 import os
 
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+
+# Created once per function instance so warm invocations reuse the connection
+_SUPABASE: Optional[Client] = (
+    create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY else None
+)
+
+
+def _dumps(payload) -> str:
+    """Serialize a response body, numpy values and datetimes included"""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC).decode()
+
 
 def handler(req):
     """Handle paper trading requests"""
     
-    # Initialize Supabase client
-    url = os.environ.get("SUPABASE_URL")
-    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-    supabase: Client = create_client(url, key)
-    
     try:
-        body = json.loads(req.body)
+        supabase = _SUPABASE
+        if supabase is None:
+            raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+        
+        body = orjson.loads(req.body)
         action = body.get('action')
         
         if action == 'submit_order':
@@ -39,30 +53,20 @@ def handler(req):
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"order": result.data[0]})
+                "body": _dumps({"order": result.data[0]})
             }
         
         elif action == 'get_portfolio':
             # Get portfolio summary
             user_id = body.get('user_id')
             
-            # Get positions
-            positions = supabase.table('paper_positions').select('*').eq(
-                'user_id', user_id
-            ).execute()
-            
-            # Get account info
-            account = supabase.table('paper_accounts').select('*').eq(
-                'user_id', user_id
-            ).single().execute()
+            # Account and positions come back together from one RPC call
+            portfolio = supabase.rpc('get_portfolio', {'uid': user_id}).execute()
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({
-                    "account": account.data,
-                    "positions": positions.data
-                })
+                "body": _dumps(portfolio.data or {"account": None, "positions": []})
             }
         
         elif action == 'get_trade_history':
@@ -76,19 +80,19 @@ def handler(req):
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"trades": trades.data})
+                "body": _dumps({"trades": trades.data})
             }
         
         else:
             return {
                 "statusCode": 400,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Invalid action"})
+                "body": _dumps({"error": "Invalid action"})
             }
             
     except Exception as e:
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": str(e)})
+            "body": _dumps({"error": str(e)})
         }
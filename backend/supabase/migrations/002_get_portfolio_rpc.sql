@@ -0,0 +1,18 @@
+-- Return a user's paper account and positions in a single round trip
+CREATE OR REPLACE FUNCTION get_portfolio(uid UUID)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'account', to_jsonb(a),
+        'positions', COALESCE(
+            jsonb_agg(to_jsonb(p)) FILTER (WHERE p.id IS NOT NULL),
+            '[]'::jsonb
+        )
+    )
+    FROM paper_accounts a
+    LEFT JOIN paper_positions p ON p.user_id = a.user_id
+    WHERE a.user_id = uid
+    GROUP BY a.id;
+$$;
@@ -0,0 +1,20 @@
+-- Create table for per-run optimization results
+CREATE TABLE IF NOT EXISTS optimization_results (
+    id BIGSERIAL PRIMARY KEY,
+    job_id BIGINT REFERENCES optimization_jobs(id) ON DELETE CASCADE,
+    params JSONB,
+    results JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX idx_optimization_results_job_id ON optimization_results(job_id);
+
+ALTER TABLE optimization_results ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view results of their own optimization jobs" ON optimization_results
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1 FROM optimization_jobs j
+            WHERE j.id = optimization_results.job_id AND j.user_id = auth.uid()
+        )
+    );
@@ -2,22 +2,38 @@
 PulseEngine Core Trading Library
 """
 
-from .backtester import BacktestEngine, Trade
-from .optimizer import StrategyOptimizer
-from .greeks import OptionsGreeks
-from .paper_trader import PaperTrader, Order, Position, OrderStatus, OrderType, OrderSide
+from importlib import import_module
 
 __version__ = '0.1.0'
 
-__all__ = [
-    'BacktestEngine',
-    'Trade',
-    'StrategyOptimizer',
-    'OptionsGreeks',
-    'PaperTrader',
-    'Order',
-    'Position',
-    'OrderStatus',
-    'OrderType',
-    'OrderSide'
-]
+# Public name -> submodule that defines it. Submodules are imported on first
+# attribute access, so `from core import PaperTrader` does not pull in pandas
+# or compile the backtester and greeks kernels.
+_EXPORTS = {
+    'BacktestEngine': '.backtester',
+    'Trade': '.backtester',
+    'StrategyOptimizer': '.optimizer',
+    'OptionsGreeks': '.greeks',
+    'PaperTrader': '.paper_trader',
+    'Order': '.paper_trader',
+    'Position': '.paper_trader',
+    'PositionView': '.paper_trader',
+    'OrderStatus': '.paper_trader',
+    'OrderType': '.paper_trader',
+    'OrderSide': '.paper_trader'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,23 @@
+"""
+Optional Numba support
+Kernels decorated with njit run as plain Python when numba is not installed
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+__all__ = ['njit', 'prange', 'NUMBA_AVAILABLE']
@@ -3,10 +3,121 @@ Backtesting Engine
 Simulates trading strategies on historical data
 """
 
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Callable, Optional
+from typing import List, Dict, Callable, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+from .._numba import njit
+
+
+@dataclass(frozen=True)
+class _CachedFeed:
+    """Strategy-independent arrays derived once from a price DataFrame"""
+    close: np.ndarray
+    index: pd.Index
+    
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> "_CachedFeed":
+        """Build a feed from a DataFrame with a 'close' column"""
+        return cls(close=data['close'].to_numpy(dtype=np.float64), index=data.index)
+    
+    def slice(self, start: int, stop: int) -> "_CachedFeed":
+        """Positional slice; the close array is a view, not a copy"""
+        return _CachedFeed(close=self.close[start:stop], index=self.index[start:stop])
+
+
+# Metrics that are meaningless for a run stopped part way through
+_PRUNED_NAN_METRICS = ("total_return", "win_rate", "avg_win", "avg_loss",
+                       "profit_factor", "final_capital")
+
+
+def _is_precomputable(strategy) -> bool:
+    """True if strategy splits into precompute(data) and signals(features, params)"""
+    return hasattr(strategy, 'precompute') and hasattr(strategy, 'signals')
+
+
+@njit(cache=True)
+def _backtest_kernel(close: np.ndarray, sig: np.ndarray, initial_capital: float,
+                     commission: float, min_allowed: float):
+    """
+    Bar-by-bar backtest that keeps only running aggregates
+    
+    Same trading rules as BacktestEngine.run_backtest, but no trades or
+    equity curve are stored, so it suits optimizers that only need metrics.
+    
+    Returns:
+        Tuple of (trades, wins, losses, total pnl, gross profit, gross loss,
+        final capital, max drawdown, stop bar or len(close) if never stopped)
+    """
+    n = close.shape[0]
+    capital = initial_capital
+    in_position = False
+    entry_px = 0.0
+    qty = 0
+    n_trades = 0
+    n_wins = 0
+    n_losses = 0
+    total_pnl = 0.0
+    gross_profit = 0.0
+    gross_loss = 0.0
+    peak = -np.inf
+    max_dd = 0.0
+    stop = n
+    
+    for i in range(n):
+        px = close[i]
+        equity = capital + (px - entry_px) * qty if in_position else capital
+        if equity > peak:
+            peak = equity
+        if peak > 0.0 and (peak - equity) / peak > max_dd:
+            max_dd = (peak - equity) / peak
+        
+        value = capital + px * qty if in_position else capital
+        if value < min_allowed:
+            stop = i
+            break
+        
+        if sig[i] > 0 and not in_position:
+            quantity = int(capital * 0.95 / px)
+            cost = quantity * px * (1 + commission)
+            if cost <= capital:
+                capital -= cost
+                in_position = True
+                entry_px = px
+                qty = quantity
+        elif sig[i] < 0 and in_position:
+            pnl = (px - entry_px) * qty
+            n_trades += 1
+            total_pnl += pnl
+            if pnl > 0:
+                n_wins += 1
+                gross_profit += pnl
+            elif pnl < 0:
+                n_losses += 1
+                gross_loss -= pnl
+            capital += qty * px * (1 - commission)
+            in_position = False
+            qty = 0
+    
+    # Close any open position at the end
+    if in_position and stop == n:
+        px = close[n - 1]
+        pnl = (px - entry_px) * qty
+        n_trades += 1
+        total_pnl += pnl
+        if pnl > 0:
+            n_wins += 1
+            gross_profit += pnl
+        elif pnl < 0:
+            n_losses += 1
+            gross_loss -= pnl
+        capital += qty * px * (1 - commission)
+    
+    return (n_trades, n_wins, n_losses, total_pnl, gross_profit, gross_loss,
+            capital, max_dd, stop)
+
 
 class Trade:
     """Represents a single trade"""
@@ -61,88 +172,272 @@ class BacktestEngine:
         self.initial_capital = initial_capital
         self.capital = initial_capital
         self.commission = commission
-        self.trades: List[Trade] = []
-        self.equity_curve: List[Dict] = []
+        self._set_equity(pd.Index([]), np.empty(0), np.empty(0))
+        self._set_trades(pd.Index([]), [], [], [], np.empty(0))
+        
+    def _set_equity(self, timestamps: pd.Index, equity: np.ndarray, capital: np.ndarray):
+        """Store the per-bar equity curve as parallel arrays"""
+        self._eq_ts = timestamps
+        self._eq_val = equity
+        self._eq_cap = capital
+        self._equity_curve: Optional[List[Dict]] = None
+    
+    @property
+    def equity_curve(self) -> List[Dict]:
+        """Per-bar equity records, materialized from the equity arrays on first access"""
+        if self._equity_curve is None:
+            self._equity_curve = [
+                {'timestamp': ts, 'equity': eq, 'capital': cap}
+                for ts, eq, cap in zip(self._eq_ts, self._eq_val.tolist(), self._eq_cap.tolist())
+            ]
+        return self._equity_curve
         
+    def _set_trades(self, index: pd.Index, entries: List[int], exits: List[int],
+                    quantities: List[int], close: np.ndarray):
+        """Store completed trades as parallel arrays (one element per trade)"""
+        self._index = index
+        self._entry_idx = np.asarray(entries, dtype=np.int64)
+        self._exit_idx = np.asarray(exits, dtype=np.int64)
+        self._entry_px = close[self._entry_idx]
+        self._exit_px = close[self._exit_idx]
+        self._qty = np.asarray(quantities, dtype=np.int64)
+        self._side = np.ones(len(self._qty))  # +1 long, -1 short
+        self._trades: Optional[List[Trade]] = None
+    
+    @property
+    def trades(self) -> List[Trade]:
+        """Completed trades, materialized from the trade arrays on first access"""
+        if self._trades is None:
+            self._trades = [
+                Trade(
+                    symbol="SYMBOL",
+                    entry_time=self._index[entry],
+                    entry_price=entry_px,
+                    quantity=int(quantity),
+                    side="long" if side > 0 else "short",
+                    exit_time=self._index[exit_],
+                    exit_price=exit_px
+                )
+                for entry, exit_, entry_px, exit_px, quantity, side in zip(
+                    self._entry_idx, self._exit_idx, self._entry_px, self._exit_px,
+                    self._qty, self._side
+                )
+            ]
+        return self._trades
+    
     def run_backtest(self, data: pd.DataFrame, strategy: Callable,
-                     params: Optional[Dict] = None) -> Dict:
+                     params: Optional[Dict] = None, feed: Optional[_CachedFeed] = None,
+                     record_equity: bool = True, equity_sampling: int = 1,
+                     signals: Optional[np.ndarray] = None,
+                     early_stop_equity_ratio: float = 0.0) -> Dict:
         """
         Run backtest on historical data
         
         Args:
             data: DataFrame with OHLCV data (columns: open, high, low, close, volume)
-            strategy: Strategy function that takes (data, params) and returns signals
+            strategy: Strategy function that takes (data, params) and returns signals,
+                or an object with precompute(data) and signals(features, params)
             params: Strategy parameters
+            feed: Precomputed close/index arrays for data, skips the pandas conversion
+            record_equity: Keep the equity curve after the run (max drawdown is
+                computed either way)
+            equity_sampling: Keep every Nth bar of the equity curve
+            signals: Precomputed signals for data; the strategy is not called
+            early_stop_equity_ratio: Stop at the first bar where cash plus position
+                value falls below this fraction of initial capital. The result is flagged 'pruned'
+                and return-based metrics are NaN. The default 0.0 never stops.
             
         Returns:
             Dictionary with backtest results
         """
+        if equity_sampling < 1:
+            raise ValueError("equity_sampling must be at least 1")
+        
         self.capital = self.initial_capital
-        self.trades = []
-        self.equity_curve = []
         
         if params is None:
             params = {}
         
         # Generate signals from strategy
-        signals = strategy(data, params)
+        if signals is None:
+            if _is_precomputable(strategy):
+                signals = strategy.signals(strategy.precompute(data), params)
+            else:
+                signals = strategy(data, params)
+        
+        if feed is None:
+            feed = _CachedFeed.from_frame(data)
+        close = feed.close
+        n = len(close)
+        
+        # Bars past the end of the signal series are treated as "hold"
+        sig = np.zeros(n)
+        raw = np.asarray(signals, dtype=np.float64)[:n]
+        sig[:len(raw)] = raw
+        
+        min_allowed = self.initial_capital * early_stop_equity_ratio
+        entries, exits, quantities, change_bars, change_capital, stop = self._find_trades(
+            close, sig, min_allowed
+        )
+        # A run stopped mid-trade leaves one more entry than exits
+        self._set_trades(feed.index, entries[:len(exits)], exits, quantities[:len(exits)], close)
+        
+        # Rebuild per-bar capital and open position from the trade change points.
+        # Equity is recorded before the bar's signal is acted on, so a position
+        # opened at bar e first shows up at bar e + 1.
+        seg = np.searchsorted(change_bars, np.arange(n), side='right') - 1
+        capital = np.asarray(change_capital)[seg]
+        is_open = np.zeros(len(change_bars), dtype=bool)
+        entry_px = np.zeros(len(change_bars))
+        qty = np.zeros(len(change_bars))
+        is_open[1::2] = True
+        entry_px[1::2] = close[np.asarray(entries, dtype=np.int64)]
+        qty[1::2] = quantities
+        equity = np.where(is_open[seg], capital + (close - entry_px[seg]) * qty[seg], capital)
+        
+        pruned = stop < n
+        if pruned:
+            # Bars after the stop are never reached
+            equity = equity[:stop + 1]
+            capital = capital[:stop + 1]
+            feed = feed.slice(0, stop + 1)
         
-        # Track positions
-        position = None
+        if record_equity and equity_sampling == 1:
+            self._set_equity(feed.index, equity, capital)
+        elif record_equity:
+            # Copy so the full-resolution arrays can be freed
+            self._set_equity(feed.index[::equity_sampling], equity[::equity_sampling].copy(),
+                             capital[::equity_sampling].copy())
+        else:
+            self._set_equity(feed.index[:0], equity[:0].copy(), capital[:0].copy())
+        
+        metrics = self._calculate_metrics(equity)
+        if pruned:
+            metrics.update(dict.fromkeys(_PRUNED_NAN_METRICS, float('nan')))
+            metrics['pruned'] = True
+        return metrics
+    
+    def evaluate(self, close: np.ndarray, signals: np.ndarray,
+                 early_stop_equity_ratio: float = 0.0) -> Dict:
+        """
+        Compute backtest metrics without recording trades or the equity curve
+        
+        Intended for optimizers that evaluate many signal arrays against the
+        same close prices. Runs as one compiled loop when numba is installed.
+        
+        Args:
+            close: Close prices as a float64 array
+            signals: Signal per bar (1 buy, -1 sell, 0 hold), same length as close
+            early_stop_equity_ratio: See run_backtest
+            
+        Returns:
+            Dictionary with the same metrics as run_backtest
+        """
+        n = len(close)
+        sig = np.zeros(n)
+        raw = np.asarray(signals, dtype=np.float64)[:n]
+        sig[:len(raw)] = raw
+        
+        (n_trades, n_wins, n_losses, total_pnl, gross_profit, gross_loss,
+         self.capital, max_drawdown, stop) = _backtest_kernel(
+            close, sig, float(self.initial_capital), float(self.commission),
+            self.initial_capital * early_stop_equity_ratio
+        )
+        
+        metrics = self._summarize(n_trades, n_wins, n_losses, total_pnl, gross_profit,
+                                  gross_loss, max_drawdown)
+        if stop < n:
+            metrics.update(dict.fromkeys(_PRUNED_NAN_METRICS, float('nan')))
+            metrics['pruned'] = True
+        return metrics
+    
+    def _find_trades(self, close: np.ndarray, sig: np.ndarray,
+                     min_allowed: float = 0.0) -> Tuple:
+        """
+        Walk the signal array from trade to trade instead of bar to bar
+        
+        Entries are the first buy signal while flat and exits the first sell
+        signal after an entry, so both can be located with a binary search over
+        the signal bars. Python only runs once per trade (or rejected entry).
+        Updates self.capital as trades are opened and closed.
         
-        for i, (idx, row) in enumerate(data.iterrows()):
-            signal = signals.iloc[i] if i < len(signals) else 0
+        The walk stops at the first bar whose account value (cash plus position
+        value) is below min_allowed; a position still open at that bar gets an
+        entry but no exit.
+        
+        Returns:
+            Tuple of (entry bars, exit bars, quantities, capital change bars,
+            capital after each change, stop bar or len(close) if never stopped)
+        """
+        n = len(close)
+        buy_bars = np.flatnonzero(sig > 0)
+        sell_bars = np.flatnonzero(sig < 0)
+        
+        entries: List[int] = []
+        exits: List[int] = []
+        quantities: List[int] = []
+        change_bars = [0]
+        change_capital = [self.capital]
+        stop = 0 if self.capital < min_allowed else n
+        
+        start = 0
+        while stop == n:
+            k = np.searchsorted(buy_bars, start)
+            if k == len(buy_bars):
+                break
+            entry = int(buy_bars[k])
+            
+            # Enter long position
+            quantity = int(self.capital * 0.95 / close[entry])
+            cost = quantity * close[entry] * (1 + self.commission)
+            if cost > self.capital:
+                start = entry + 1
+                continue
+            self.capital -= cost
+            change_bars.append(entry + 1)
+            change_capital.append(self.capital)
             
-            # Record equity
-            current_value = self.capital
-            if position:
-                current_value += (row['close'] - position.entry_price) * position.quantity
+            # Exit on the next sell signal, or close out at the last bar
+            j = np.searchsorted(sell_bars, entry)
+            exit_ = int(sell_bars[j]) if j < len(sell_bars) else n - 1
             
-            self.equity_curve.append({
-                'timestamp': idx,
-                'equity': current_value,
-                'capital': self.capital
-            })
+            if min_allowed > 0:
+                # Account value (cash plus position value) while the position is open
+                held = self.capital + close[entry + 1:exit_ + 1] * quantity
+                below = np.flatnonzero(held < min_allowed)
+                if below.size:
+                    stop = entry + 1 + int(below[0])
+                    entries.append(entry)
+                    quantities.append(quantity)
+                    break
             
-            # Execute trades based on signals
-            if signal > 0 and position is None:
-                # Enter long position
-                quantity = int(self.capital * 0.95 / row['close'])
-                cost = quantity * row['close'] * (1 + self.commission)
-                
-                if cost <= self.capital:
-                    position = Trade(
-                        symbol="SYMBOL",
-                        entry_time=idx,
-                        entry_price=row['close'],
-                        quantity=quantity,
-                        side="long"
-                    )
-                    self.capital -= cost
-                    
-            elif signal < 0 and position is not None:
-                # Exit position
-                proceeds = position.quantity * row['close'] * (1 - self.commission)
-                position.exit_time = idx
-                position.exit_price = row['close']
-                self.capital += proceeds
-                self.trades.append(position)
-                position = None
-        
-        # Close any open position at the end
-        if position is not None:
-            last_price = data.iloc[-1]['close']
-            proceeds = position.quantity * last_price * (1 - self.commission)
-            position.exit_time = data.index[-1]
-            position.exit_price = last_price
-            self.capital += proceeds
-            self.trades.append(position)
-        
-        return self._calculate_metrics()
-    
-    def _calculate_metrics(self) -> Dict:
-        """Calculate backtest performance metrics"""
-        if not self.trades:
+            self.capital += quantity * close[exit_] * (1 - self.commission)
+            change_bars.append(exit_ + 1)
+            change_capital.append(self.capital)
+            
+            entries.append(entry)
+            exits.append(exit_)
+            quantities.append(quantity)
+            start = exit_ + 1
+            if self.capital < min_allowed and start < n:
+                stop = start
+        
+        return entries, exits, quantities, change_bars, change_capital, stop
+    
+    def _calculate_metrics(self, equity: np.ndarray) -> Dict:
+        """Calculate backtest performance metrics from the trades and full equity curve"""
+        pnl = (self._exit_px - self._entry_px) * self._qty * self._side
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        return self._summarize(
+            len(pnl), wins.size, losses.size, float(pnl.sum()), float(wins.sum()),
+            float(-losses.sum()), self._calculate_max_drawdown(equity) if len(pnl) else 0.0
+        )
+    
+    def _summarize(self, n_trades: int, n_wins: int, n_losses: int, total_pnl: float,
+                   gross_profit: float, gross_loss: float, max_drawdown: float) -> Dict:
+        """Assemble the metrics dictionary from per-run aggregates"""
+        if n_trades == 0:
             return {
                 "total_trades": 0,
                 "winning_trades": 0,
@@ -156,47 +451,30 @@ class BacktestEngine:
                 "final_capital": self.capital
             }
         
-        winning_trades = [t for t in self.trades if t.pnl and t.pnl > 0]
-        losing_trades = [t for t in self.trades if t.pnl and t.pnl < 0]
-        
-        total_pnl = sum(t.pnl for t in self.trades if t.pnl)
         total_return = (self.capital - self.initial_capital) / self.initial_capital
-        
-        avg_win = sum(t.pnl for t in winning_trades) / len(winning_trades) if winning_trades else 0
-        avg_loss = abs(sum(t.pnl for t in losing_trades) / len(losing_trades)) if losing_trades else 0
-        
-        gross_profit = sum(t.pnl for t in winning_trades)
-        gross_loss = abs(sum(t.pnl for t in losing_trades))
+        avg_win = gross_profit / n_wins if n_wins else 0
+        avg_loss = gross_loss / n_losses if n_losses else 0
         profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
         
         return {
-            "total_trades": len(self.trades),
-            "winning_trades": len(winning_trades),
-            "losing_trades": len(losing_trades),
+            "total_trades": int(n_trades),
+            "winning_trades": int(n_wins),
+            "losing_trades": int(n_losses),
             "total_pnl": total_pnl,
             "total_return": total_return,
-            "win_rate": len(winning_trades) / len(self.trades),
+            "win_rate": n_wins / n_trades,
             "avg_win": avg_win,
             "avg_loss": avg_loss,
             "profit_factor": profit_factor,
             "final_capital": self.capital,
-            "max_drawdown": self._calculate_max_drawdown()
+            "max_drawdown": max_drawdown
         }
     
-    def _calculate_max_drawdown(self) -> float:
+    def _calculate_max_drawdown(self, equity: np.ndarray) -> float:
         """Calculate maximum drawdown from equity curve"""
-        if not self.equity_curve:
+        if len(equity) == 0:
             return 0.0
         
-        equity_values = [point['equity'] for point in self.equity_curve]
-        peak = equity_values[0]
-        max_dd = 0.0
-        
-        for value in equity_values:
-            if value > peak:
-                peak = value
-            dd = (peak - value) / peak
-            if dd > max_dd:
-                max_dd = dd
-        
-        return max_dd
+        peak = np.maximum.accumulate(equity)
+        dd = np.divide(peak - equity, peak, out=np.zeros_like(peak), where=peak > 0)
+        return float(dd.max())
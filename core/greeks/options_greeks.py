@@ -4,13 +4,64 @@ Calculates Delta, Gamma, Vega, Theta, and Rho for options pricing
 """
 
 import math
-from scipy.stats import norm
-from typing import Dict, Literal
+import numpy as np
+from scipy.special import ndtr
+from typing import Dict, Literal, Tuple, Union
+
+from .._numba import njit
+
+ArrayLike = Union[float, np.ndarray]
+
+_SQRT_2 = math.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+# Typed signature: numba compiles (or loads from the on-disk cache) when the
+# module is imported, so no request pays the compile on its first call
+@njit('UniTuple(f8, 5)(f8, f8, f8, f8, f8, f8, b1)', cache=True, fastmath=True)
+def _all_greeks_njit(S: float, K: float, T: float, sigma: float, r: float, q: float,
+                     is_call: bool):
+    """
+    Compute (delta, gamma, vega, theta, rho) in one pass
+    
+    d1, d2, the discount factors and the normal pdf of d1 are evaluated once
+    and shared across all five Greeks. The normal CDF is inlined via erfc,
+    which stays accurate in the tails.
+    """
+    sqrt_t = math.sqrt(T)
+    vol_sqrt_t = sigma * sqrt_t
+    eqt = math.exp(-q * T)
+    ert = math.exp(-r * T)
+    d1 = (math.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    pdf_d1 = math.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+    
+    gamma = eqt * pdf_d1 / (S * vol_sqrt_t)
+    vega = S * eqt * pdf_d1 * sqrt_t
+    term1 = -(S * eqt * pdf_d1 * sigma) / (2.0 * sqrt_t)
+    
+    if is_call:
+        cdf_d1 = 0.5 * math.erfc(-d1 / _SQRT_2)
+        cdf_d2 = 0.5 * math.erfc(-d2 / _SQRT_2)
+        delta = eqt * cdf_d1
+        theta = term1 + q * S * eqt * cdf_d1 - r * K * ert * cdf_d2
+        rho = K * T * ert * cdf_d2
+    else:
+        cdf_d1 = 0.5 * math.erfc(-d1 / _SQRT_2)
+        cdf_neg_d1 = 0.5 * math.erfc(d1 / _SQRT_2)
+        cdf_neg_d2 = 0.5 * math.erfc(d2 / _SQRT_2)
+        delta = eqt * (cdf_d1 - 1.0)
+        theta = term1 - q * S * eqt * cdf_neg_d1 + r * K * ert * cdf_neg_d2
+        rho = -K * T * ert * cdf_neg_d2
+    
+    return delta, gamma, vega, theta, rho
 
 
 class OptionsGreeks:
     """Calculate options Greeks using Black-Scholes model"""
     
+    _cdf = staticmethod(ndtr)
+    
     def __init__(self, spot_price: float, strike_price: float, 
                  time_to_expiry: float, volatility: float, 
                  risk_free_rate: float, dividend_yield: float = 0.0):
@@ -31,15 +82,34 @@ class OptionsGreeks:
         self.sigma = volatility
         self.r = risk_free_rate
         self.q = dividend_yield
+        self._terms_key = None
+        self._terms = None
+        
+    def _shared_terms(self) -> Tuple[float, float, float, float, float, float]:
+        """
+        Terms shared by every Greek, computed once per set of inputs
         
+        Returns:
+            Tuple of (d1, d2, sqrt(T), exp(-qT), exp(-rT), pdf(d1))
+        """
+        key = (self.S, self.K, self.T, self.sigma, self.r, self.q)
+        if key != self._terms_key:
+            sqrt_t = math.sqrt(self.T)
+            vol_sqrt_t = self.sigma * sqrt_t
+            d1 = (math.log(self.S / self.K)
+                  + (self.r - self.q + 0.5 * self.sigma ** 2) * self.T) / vol_sqrt_t
+            self._terms = (d1, d1 - vol_sqrt_t, sqrt_t, math.exp(-self.q * self.T),
+                           math.exp(-self.r * self.T), math.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI)
+            self._terms_key = key
+        return self._terms
+    
     def _d1(self) -> float:
         """Calculate d1 parameter for Black-Scholes"""
-        return (math.log(self.S / self.K) + (self.r - self.q + 0.5 * self.sigma ** 2) * self.T) / \
-               (self.sigma * math.sqrt(self.T))
+        return self._shared_terms()[0]
     
     def _d2(self) -> float:
         """Calculate d2 parameter for Black-Scholes"""
-        return self._d1() - self.sigma * math.sqrt(self.T)
+        return self._shared_terms()[1]
     
     def delta(self, option_type: Literal["call", "put"] = "call") -> float:
         """
@@ -51,11 +121,11 @@ class OptionsGreeks:
         Returns:
             Delta value
         """
-        d1 = self._d1()
+        d1, _, _, eqt, _, _ = self._shared_terms()
         if option_type == "call":
-            return math.exp(-self.q * self.T) * norm.cdf(d1)
+            return eqt * self._cdf(d1)
         else:
-            return math.exp(-self.q * self.T) * (norm.cdf(d1) - 1)
+            return eqt * (self._cdf(d1) - 1)
     
     def gamma(self) -> float:
         """
@@ -64,9 +134,8 @@ class OptionsGreeks:
         Returns:
             Gamma value (same for calls and puts)
         """
-        d1 = self._d1()
-        return (math.exp(-self.q * self.T) * norm.pdf(d1)) / \
-               (self.S * self.sigma * math.sqrt(self.T))
+        _, _, sqrt_t, eqt, _, pdf_d1 = self._shared_terms()
+        return (eqt * pdf_d1) / (self.S * self.sigma * sqrt_t)
     
     def vega(self) -> float:
         """
@@ -75,8 +144,8 @@ class OptionsGreeks:
         Returns:
             Vega value (same for calls and puts)
         """
-        d1 = self._d1()
-        return self.S * math.exp(-self.q * self.T) * norm.pdf(d1) * math.sqrt(self.T)
+        _, _, sqrt_t, eqt, _, pdf_d1 = self._shared_terms()
+        return self.S * eqt * pdf_d1 * sqrt_t
     
     def theta(self, option_type: Literal["call", "put"] = "call") -> float:
         """
@@ -88,18 +157,16 @@ class OptionsGreeks:
         Returns:
             Theta value (per year, divide by 365 for daily)
         """
-        d1 = self._d1()
-        d2 = self._d2()
+        d1, d2, sqrt_t, eqt, ert, pdf_d1 = self._shared_terms()
         
-        term1 = -(self.S * math.exp(-self.q * self.T) * norm.pdf(d1) * self.sigma) / \
-                (2 * math.sqrt(self.T))
+        term1 = -(self.S * eqt * pdf_d1 * self.sigma) / (2 * sqrt_t)
         
         if option_type == "call":
-            term2 = self.q * self.S * math.exp(-self.q * self.T) * norm.cdf(d1)
-            term3 = -self.r * self.K * math.exp(-self.r * self.T) * norm.cdf(d2)
+            term2 = self.q * self.S * eqt * self._cdf(d1)
+            term3 = -self.r * self.K * ert * self._cdf(d2)
         else:
-            term2 = -self.q * self.S * math.exp(-self.q * self.T) * norm.cdf(-d1)
-            term3 = self.r * self.K * math.exp(-self.r * self.T) * norm.cdf(-d2)
+            term2 = -self.q * self.S * eqt * self._cdf(-d1)
+            term3 = self.r * self.K * ert * self._cdf(-d2)
         
         return term1 + term2 + term3
     
@@ -113,12 +180,12 @@ class OptionsGreeks:
         Returns:
             Rho value
         """
-        d2 = self._d2()
+        _, d2, _, _, ert, _ = self._shared_terms()
         
         if option_type == "call":
-            return self.K * self.T * math.exp(-self.r * self.T) * norm.cdf(d2)
+            return self.K * self.T * ert * self._cdf(d2)
         else:
-            return -self.K * self.T * math.exp(-self.r * self.T) * norm.cdf(-d2)
+            return -self.K * self.T * ert * self._cdf(-d2)
     
     def all_greeks(self, option_type: Literal["call", "put"] = "call") -> Dict[str, float]:
         """
@@ -130,6 +197,22 @@ class OptionsGreeks:
         Returns:
             Dictionary containing all Greeks
         """
+        S, K, T, sigma, r, q = (float(self.S), float(self.K), float(self.T),
+                                float(self.sigma), float(self.r), float(self.q))
+        # NaN and non-positive inputs are undefined behaviour under fastmath, keep them
+        # off the kernel
+        if S > 0 and K > 0 and T > 0 and sigma > 0 and not math.isnan(S + K + r + q):
+            delta, gamma, vega, theta, rho = _all_greeks_njit(S, K, T, sigma, r, q,
+                                                              option_type == "call")
+            return {
+                "delta": delta,
+                "gamma": gamma,
+                "vega": vega,
+                "theta": theta,
+                "rho": rho
+            }
+        
+        # Degenerate inputs go through the scalar methods so they behave the same way
         return {
             "delta": self.delta(option_type),
             "gamma": self.gamma(),
@@ -137,3 +220,57 @@ class OptionsGreeks:
             "theta": self.theta(option_type),
             "rho": self.rho(option_type)
         }
+    
+    @classmethod
+    def batch_greeks(cls, S: ArrayLike, K: ArrayLike, T: ArrayLike, sigma: ArrayLike,
+                     r: ArrayLike, q: ArrayLike = 0.0,
+                     is_call: Union[bool, np.ndarray] = True) -> Dict[str, np.ndarray]:
+        """
+        Calculate all Greeks for many options in one vectorized pass
+        
+        Inputs are broadcast against each other, so scalars can be mixed with
+        1-D arrays (e.g. one spot price against a vector of strikes).
+        
+        Args:
+            S: Spot prices
+            K: Strike prices
+            T: Times to expiration in years
+            sigma: Implied volatilities (annualized)
+            r: Risk-free rates (annualized)
+            q: Continuous dividend yields (annualized)
+            is_call: True for calls, False for puts (scalar or boolean array)
+            
+        Returns:
+            Dictionary mapping each Greek name to an array of values
+        """
+        S = np.asarray(S, dtype=np.float64)
+        K = np.asarray(K, dtype=np.float64)
+        T = np.asarray(T, dtype=np.float64)
+        sigma = np.asarray(sigma, dtype=np.float64)
+        r = np.asarray(r, dtype=np.float64)
+        q = np.asarray(q, dtype=np.float64)
+        is_call = np.asarray(is_call, dtype=bool)
+        
+        sqrt_t = np.sqrt(T)
+        vol_sqrt_t = sigma * sqrt_t
+        eqt = np.exp(-q * T)
+        ert = np.exp(-r * T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_sqrt_t
+        d2 = d1 - vol_sqrt_t
+        pdf_d1 = np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+        cdf_d1 = ndtr(d1)
+        cdf_d2 = ndtr(d2)
+        cdf_neg_d1 = ndtr(-d1)
+        cdf_neg_d2 = ndtr(-d2)
+        
+        term1 = -(S * eqt * pdf_d1 * sigma) / (2.0 * sqrt_t)
+        call_theta = term1 + q * S * eqt * cdf_d1 - r * K * ert * cdf_d2
+        put_theta = term1 - q * S * eqt * cdf_neg_d1 + r * K * ert * cdf_neg_d2
+        
+        return {
+            "delta": np.where(is_call, eqt * cdf_d1, eqt * (cdf_d1 - 1.0)),
+            "gamma": eqt * pdf_d1 / (S * vol_sqrt_t),
+            "vega": S * eqt * pdf_d1 * sqrt_t,
+            "theta": np.where(is_call, call_theta, put_theta),
+            "rho": np.where(is_call, K * T * ert * cdf_d2, -K * T * ert * cdf_neg_d2)
+        }
@@ -3,11 +3,15 @@ Strategy Optimizer
 Optimizes trading strategy parameters using various methods
 """
 
-from typing import Dict, List, Callable, Tuple, Any
+from typing import Dict, List, Callable, Tuple, Any, Iterable, Optional
 import numpy as np
 from itertools import product
 import pandas as pd
 
+from .._numba import NUMBA_AVAILABLE
+from ..backtester import BacktestEngine
+from ..backtester.engine import _CachedFeed, _is_precomputable
+
 
 class StrategyOptimizer:
     """Optimize trading strategy parameters"""
@@ -23,9 +27,79 @@ class StrategyOptimizer:
         self.backtest_engine = backtest_engine
         self.data = data
         self.results: List[Dict] = []
+        self._feed: Optional[_CachedFeed] = None
+        
+    @property
+    def feed(self) -> _CachedFeed:
+        """Close/index arrays for self.data, converted from pandas once and reused by every run"""
+        if self._feed is None:
+            self._feed = _CachedFeed.from_frame(self.data)
+        return self._feed
+    
+    def _precompute(self, strategy: Callable) -> Any:
+        """Parameter-independent strategy features for self.data, if the strategy has any"""
+        return strategy.precompute(self.data) if _is_precomputable(strategy) else None
+    
+    def _run_one(self, strategy: Callable, params: Dict, features: Any = None,
+                 early_stop_equity_ratio: float = 0.0
+                 ) -> Tuple[Dict, Optional[Dict], Optional[Exception]]:
+        """
+        Run a single backtest on a fresh engine
+        
+        Each run gets its own engine of the same class as self.backtest_engine
+        so no mutable state is shared between runs, which lets them execute in
+        separate worker processes. When features are given only
+        strategy.signals() runs per parameter set. With numba installed a plain
+        BacktestEngine takes its metrics from the compiled kernel over the
+        cached close array, skipping the per-run trade and equity bookkeeping;
+        subclasses always go through their own run_backtest.
+        
+        Returns:
+            Tuple of (params, results, error); results is None if the run failed
+        """
+        engine_type = type(self.backtest_engine)
+        engine = engine_type(
+            initial_capital=self.backtest_engine.initial_capital,
+            commission=self.backtest_engine.commission
+        )
+        try:
+            if _is_precomputable(strategy):
+                signals = strategy.signals(features, params)
+            else:
+                signals = strategy(self.data, params)
+            
+            if NUMBA_AVAILABLE and engine_type is BacktestEngine:
+                results = engine.evaluate(self.feed.close, signals, early_stop_equity_ratio)
+            else:
+                results = engine.run_backtest(self.data, strategy, params, self.feed,
+                                              signals=signals,
+                                              early_stop_equity_ratio=early_stop_equity_ratio)
+            return params, results, None
+        except Exception as e:
+            return params, None, e
+    
+    def _run_all(self, strategy: Callable, param_sets: Iterable[Dict], n_jobs: int,
+                 early_stop_equity_ratio: float = 0.0
+                 ) -> List[Tuple[Dict, Optional[Dict], Optional[Exception]]]:
+        """Run a backtest per parameter set, in parallel when n_jobs != 1"""
+        features = self._precompute(strategy)
+        # Build the feed before dispatch so it is pickled with the bound method and
+        # workers reuse it instead of each converting self.data again
+        self.feed
+        if n_jobs == 1:
+            return [self._run_one(strategy, params, features, early_stop_equity_ratio)
+                    for params in param_sets]
         
+        from joblib import Parallel, delayed
+        return Parallel(n_jobs=n_jobs, prefer='processes')(
+            delayed(self._run_one)(strategy, params, features, early_stop_equity_ratio)
+            for params in param_sets
+        )
+    
     def grid_search(self, strategy: Callable, param_grid: Dict[str, List[Any]],
-                   metric: str = "total_return") -> Dict:
+                   metric: str = "total_return", n_jobs: int = 1,
+                   persist_fn: Optional[Callable[[List[Dict]], Any]] = None,
+                   early_stop_equity_ratio: float = 0.0) -> Dict:
         """
         Perform grid search over parameter space
         
@@ -33,6 +107,12 @@ class StrategyOptimizer:
             strategy: Strategy function
             param_grid: Dictionary mapping parameter names to lists of values
             metric: Metric to optimize (e.g., 'total_return', 'profit_factor')
+            n_jobs: Number of worker processes (-1 for all cores, requires joblib)
+            persist_fn: Called once with all results at the end, e.g. to bulk
+                insert them instead of writing one row per run
+            early_stop_equity_ratio: Abandon a run once its account value falls
+                below this fraction of initial capital. Pruned runs stay in all_results
+                (flagged 'pruned', NaN metric) but are never picked as best.
             
         Returns:
             Dictionary with best parameters and results
@@ -47,23 +127,25 @@ class StrategyOptimizer:
         best_params = None
         best_results = None
         
-        for combination in product(*param_values):
-            params = dict(zip(param_names, combination))
-            
-            # Run backtest with these parameters
-            try:
-                results = self.backtest_engine.run_backtest(self.data, strategy, params)
-                results['params'] = params
-                self.results.append(results)
-                
-                # Track best result
-                if results[metric] > best_metric:
-                    best_metric = results[metric]
-                    best_params = params
-                    best_results = results
-            except Exception as e:
-                print(f"Error with params {params}: {e}")
+        param_sets = (dict(zip(param_names, c)) for c in product(*param_values))
+        
+        for params, results, error in self._run_all(strategy, param_sets, n_jobs,
+                                                    early_stop_equity_ratio):
+            if error is not None:
+                print(f"Error with params {params}: {error}")
                 continue
+            
+            results['params'] = params
+            self.results.append(results)
+            
+            # Track best result
+            if results[metric] > best_metric:
+                best_metric = results[metric]
+                best_params = params
+                best_results = results
+        
+        if persist_fn is not None:
+            persist_fn(self.results)
         
         return {
             "best_params": best_params,
@@ -74,7 +156,7 @@ class StrategyOptimizer:
     
     def walk_forward_optimization(self, strategy: Callable, param_grid: Dict[str, List[Any]],
                                  train_period: int, test_period: int,
-                                 metric: str = "total_return") -> Dict:
+                                 metric: str = "total_return", n_jobs: int = 1) -> Dict:
         """
         Perform walk-forward optimization
         
@@ -84,6 +166,7 @@ class StrategyOptimizer:
             train_period: Number of periods for training window
             test_period: Number of periods for testing window
             metric: Metric to optimize
+            n_jobs: Number of worker processes for each training grid search
             
         Returns:
             Dictionary with walk-forward results
@@ -93,21 +176,27 @@ class StrategyOptimizer:
         
         start = 0
         while start + train_period + test_period <= n_samples:
+            train_end = start + train_period
+            test_end = train_end + test_period
+            
             # Split data
-            train_data = self.data.iloc[start:start + train_period]
-            test_data = self.data.iloc[start + train_period:start + train_period + test_period]
+            train_data = self.data.iloc[start:train_end]
+            test_data = self.data.iloc[train_end:test_end]
             
-            # Optimize on training data
+            # Optimize on training data, reusing views into the cached feed
             optimizer = StrategyOptimizer(self.backtest_engine, train_data)
-            train_results = optimizer.grid_search(strategy, param_grid, metric)
+            optimizer._feed = self.feed.slice(start, train_end)
+            train_results = optimizer.grid_search(strategy, param_grid, metric, n_jobs)
             
             # Test on out-of-sample data
             best_params = train_results['best_params']
-            test_results = self.backtest_engine.run_backtest(test_data, strategy, best_params)
+            test_results = self.backtest_engine.run_backtest(
+                test_data, strategy, best_params, self.feed.slice(train_end, test_end)
+            )
             
             results.append({
-                'train_period': (start, start + train_period),
-                'test_period': (start + train_period, start + train_period + test_period),
+                'train_period': (start, train_end),
+                'test_period': (train_end, test_end),
                 'best_params': best_params,
                 'train_metric': train_results['best_metric'],
                 'test_metric': test_results[metric],
@@ -125,8 +214,10 @@ class StrategyOptimizer:
             "consistency": np.std([r['test_metric'] for r in results])
         }
     
-    def monte_carlo_simulation(self, strategy: Callable, param_ranges: Dict[str, Tuple[float, float]],
-                              n_iterations: int = 100, metric: str = "total_return") -> Dict:
+    def monte_carlo_simulation(self, strategy: Callable,
+                               param_ranges: Dict[str, Tuple[float, float]],
+                               n_iterations: int = 100, metric: str = "total_return",
+                               n_jobs: int = 1) -> Dict:
         """
         Perform Monte Carlo simulation for parameter optimization
         
@@ -135,6 +226,7 @@ class StrategyOptimizer:
             param_ranges: Dictionary mapping parameter names to (min, max) tuples
             n_iterations: Number of random samples
             metric: Metric to optimize
+            n_jobs: Number of worker processes (-1 for all cores, requires joblib)
             
         Returns:
             Dictionary with Monte Carlo results
@@ -145,6 +237,8 @@ class StrategyOptimizer:
         best_params = None
         best_results = None
         
+        # Sample every parameter set up front so the random draws stay in this process
+        param_sets = []
         for _ in range(n_iterations):
             # Generate random parameters
             params = {}
@@ -153,19 +247,19 @@ class StrategyOptimizer:
                     params[param_name] = np.random.randint(min_val, max_val + 1)
                 else:
                     params[param_name] = np.random.uniform(min_val, max_val)
-            
-            # Run backtest
-            try:
-                results = self.backtest_engine.run_backtest(self.data, strategy, params)
-                results['params'] = params
-                self.results.append(results)
-                
-                if results[metric] > best_metric:
-                    best_metric = results[metric]
-                    best_params = params
-                    best_results = results
-            except Exception as e:
+            param_sets.append(params)
+        
+        for params, results, error in self._run_all(strategy, param_sets, n_jobs):
+            if error is not None:
                 continue
+            
+            results['params'] = params
+            self.results.append(results)
+            
+            if results[metric] > best_metric:
+                best_metric = results[metric]
+                best_params = params
+                best_results = results
         
         return {
             "best_params": best_params,
@@ -175,26 +269,96 @@ class StrategyOptimizer:
             "param_distribution": self._analyze_param_distribution(metric)
         }
     
+    def bayesian_search(self, strategy: Callable, param_ranges: Dict[str, Tuple[float, float]],
+                        n_calls: int = 50, metric: str = "total_return",
+                        n_jobs: int = 1, random_state: Optional[int] = None) -> Dict:
+        """
+        Perform Bayesian optimization with a Gaussian-process surrogate
+        
+        Needs far fewer backtests than grid search to find a comparable optimum,
+        which pays off when each backtest is expensive. Requires scikit-optimize.
+        
+        Args:
+            strategy: Strategy function
+            param_ranges: Dictionary mapping parameter names to (min, max) tuples;
+                integer bounds give an integer dimension, otherwise a real one
+            n_calls: Number of backtests to run
+            metric: Metric to optimize
+            n_jobs: Number of cores used to optimize the acquisition function
+            random_state: Seed for reproducible searches
+            
+        Returns:
+            Dictionary with best parameters, results and the metric per call
+        """
+        from skopt import gp_minimize
+        from skopt.space import Integer, Real
+        from skopt.utils import use_named_args
+        
+        self.results = []
+        
+        space = [
+            Integer(min_val, max_val, name=name)
+            if isinstance(min_val, int) and isinstance(max_val, int)
+            else Real(min_val, max_val, name=name)
+            for name, (min_val, max_val) in param_ranges.items()
+        ]
+        scores: List[float] = []
+        features = self._precompute(strategy)
+        
+        @use_named_args(space)
+        def objective(**params):
+            params = {name: value.item() if hasattr(value, 'item') else value
+                      for name, value in params.items()}
+            _, results, error = self._run_one(strategy, params, features)
+            if error is None:
+                results['params'] = params
+                self.results.append(results)
+                score = -results[metric]
+            else:
+                # Score failed runs like the worst run so far to steer away from them
+                score = max(scores, default=0.0)
+            scores.append(score)
+            return score
+        
+        res = gp_minimize(objective, space, n_calls=n_calls, n_jobs=n_jobs,
+                          random_state=random_state)
+        
+        best_params = dict(zip(param_ranges.keys(), (
+            value.item() if hasattr(value, 'item') else value for value in res.x
+        )))
+        best_results = next((r for r in self.results if r['params'] == best_params), None)
+        
+        return {
+            "best_params": best_params,
+            "best_metric": -res.fun,
+            "best_results": best_results,
+            "all_results": self.results,
+            "history": [-score for score in res.func_vals]
+        }
+    
     def _analyze_param_distribution(self, metric: str) -> Dict:
         """Analyze the distribution of parameters vs performance"""
         if not self.results:
             return {}
         
-        # Extract parameter values and metrics
+        # One frame with a column per parameter plus the metric
         param_names = list(self.results[0]['params'].keys())
-        analysis = {}
+        df = pd.DataFrame([{**r['params'], metric: r[metric]} for r in self.results])
+        values = df[param_names].astype(float)
         
-        for param_name in param_names:
-            values = [r['params'][param_name] for r in self.results]
-            metrics = [r[metric] for r in self.results]
-            
-            # Calculate correlation
-            correlation = np.corrcoef(values, metrics)[0, 1]
-            
-            analysis[param_name] = {
-                'mean': np.mean(values),
-                'std': np.std(values),
-                'correlation_with_metric': correlation
-            }
+        means = values.mean()
+        stds = values.std(ddof=0)
+        # A constant parameter has no correlation with anything
+        varying = stds.index[stds > 0]
+        correlations = values[varying].corrwith(df[metric].astype(float)).reindex(
+            param_names, fill_value=0.0
+        )
         
-        return analysis
+        return {
+            name: {
+                'mean': means[name],
+                'std': stds[name],
+                'correlation_with_metric': correlations[name]
+            }
+            for name in param_names
+        }
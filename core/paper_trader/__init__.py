@@ -1,4 +1,6 @@
 """Paper trading module"""
-from .paper_trader import PaperTrader, Order, Position, OrderStatus, OrderType, OrderSide
+from .paper_trader import (PaperTrader, Order, Position, PositionView, OrderStatus, OrderType,
+                           OrderSide)
 
-__all__ = ['PaperTrader', 'Order', 'Position', 'OrderStatus', 'OrderType', 'OrderSide']
+__all__ = ['PaperTrader', 'Order', 'Position', 'PositionView', 'OrderStatus', 'OrderType',
+           'OrderSide']
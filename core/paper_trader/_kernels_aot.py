@@ -0,0 +1,37 @@
+"""
+Ahead-of-time build of the paper trading kernels
+
+Running ``python -m core.paper_trader._kernels_aot`` compiles the kernels into
+the ``paper_kernels`` extension module next to this file. When that module is
+present the paper trader imports it instead of JIT-compiling on first use, so
+there is no warmup delay; otherwise it falls back to the njit kernels.
+Requires numba.
+"""
+
+import os
+
+from numba.pycc import CC
+
+from .paper_trader import execute_fill, execute_fills, match_pending, summarize_positions
+
+cc = CC('paper_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _export(kernel, signature: str):
+    """Export an njit kernel's Python function under its own name"""
+    cc.export(kernel.__name__, signature)(getattr(kernel, 'py_func', kernel))
+
+
+# AOT exports need concrete types, matching the arguments PaperTrader passes in
+# match_pending: prices, has_price, order_type, side, limit_px, status, symbol_idx
+_export(match_pending, 'Tuple((b1[:], f8[:]))(f8[:], b1[:], i1[:], i1[:], f8[:], i1[:], i8[:])')
+# execute_fill: side, quantity, price, commission, cash, pos_qty, pos_avg, pos_px
+_export(execute_fill, 'Tuple((b1, f8, f8, f8, f8, f8))(i8, f8, f8, f8, f8, f8, f8, f8)')
+# execute_fills: slots, side, quantity, price, commission, cash, pos_qty, pos_avg, pos_px
+_export(execute_fills,
+        'Tuple((b1[:], f8[:], f8))(i8[:], i1[:], f8[:], f8[:], f8, f8, f8[:], f8[:], f8[:])')
+_export(summarize_positions, 'UniTuple(f8[:], 3)(f8[:], f8[:], f8[:])')
+
+if __name__ == '__main__':
+    cc.compile()
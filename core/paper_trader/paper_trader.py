@@ -3,11 +3,26 @@ Paper Trading System
 Simulates live trading without real money
 """
 
-from datetime import datetime
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+import math
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+from dataclasses import dataclass
 from enum import Enum
 import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .._numba import NUMBA_AVAILABLE, njit
+
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 
 class OrderStatus(Enum):
@@ -32,7 +47,7 @@ class OrderSide(Enum):
     SELL = "sell"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Order:
     """Represents a trading order"""
     order_id: str
@@ -54,16 +69,23 @@ class Order:
     
     def to_dict(self) -> Dict:
         """Convert order to dictionary"""
-        data = asdict(self)
-        data['side'] = self.side.value
-        data['order_type'] = self.order_type.value
-        data['status'] = self.status.value
-        data['created_at'] = self.created_at.isoformat() if self.created_at else None
-        data['filled_at'] = self.filled_at.isoformat() if self.filled_at else None
-        return data
+        return {
+            "order_id": self.order_id,
+            "symbol": self.symbol,
+            "side": self.side.value,
+            "order_type": self.order_type.value,
+            "quantity": self.quantity,
+            "price": self.price,
+            "stop_price": self.stop_price,
+            "status": self.status.value,
+            "filled_quantity": self.filled_quantity,
+            "filled_price": self.filled_price,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "filled_at": self.filled_at.isoformat() if self.filled_at else None
+        }
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Position:
     """Represents a trading position"""
     symbol: str
@@ -88,17 +110,438 @@ class Position:
     
     def to_dict(self) -> Dict:
         """Convert position to dictionary"""
+        quantity = self.quantity
+        avg_price = self.avg_price
+        current_price = self.current_price
+        price_change = current_price - avg_price
         return {
             "symbol": self.symbol,
-            "quantity": self.quantity,
-            "avg_price": self.avg_price,
-            "current_price": self.current_price,
-            "market_value": self.market_value,
-            "unrealized_pnl": self.unrealized_pnl,
-            "unrealized_pnl_pct": self.unrealized_pnl_pct
+            "quantity": quantity,
+            "avg_price": avg_price,
+            "current_price": current_price,
+            "market_value": quantity * current_price,
+            "unrealized_pnl": price_change * quantity,
+            "unrealized_pnl_pct": price_change / avg_price
         }
 
 
+# Enum members are singletons, so the hot paths compare them by identity
+# against these module-level aliases instead of looking them up per call
+_BUY_SIDE, _SELL_SIDE = OrderSide.BUY, OrderSide.SELL
+_PENDING_STATUS = OrderStatus.PENDING
+_FILLED_STATUS = OrderStatus.FILLED
+_CANCELLED_STATUS = OrderStatus.CANCELLED
+_REJECTED_STATUS = OrderStatus.REJECTED
+
+# Integer codes for the order arrays; enums are only used at the API boundary
+_BUY, _SELL = 0, 1
+_MARKET, _LIMIT, _STOP, _STOP_LIMIT = 0, 1, 2, 3
+_PENDING, _FILLED, _CANCELLED, _REJECTED = 0, 1, 2, 3
+_SIDE_CODES = {OrderSide.BUY: _BUY, OrderSide.SELL: _SELL}
+_TYPE_CODES = {OrderType.MARKET: _MARKET, OrderType.LIMIT: _LIMIT, OrderType.STOP: _STOP,
+               OrderType.STOP_LIMIT: _STOP_LIMIT}
+_STATUS_CODES = {OrderStatus.PENDING: _PENDING, OrderStatus.FILLED: _FILLED,
+                 OrderStatus.CANCELLED: _CANCELLED, OrderStatus.REJECTED: _REJECTED}
+_SIDE_VALUES = (OrderSide.BUY.value, OrderSide.SELL.value)
+
+# Trade timestamps are stored as nanoseconds since this naive epoch, so the
+# naive local fill times round-trip exactly
+_EPOCH = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+
+# Quantities are stored as float64; ones given as integers are reported back
+# as int, as they were before the arrays
+_INT_TYPES = (int, np.integer)
+
+
+def _fill_time(now: Optional[datetime]) -> datetime:
+    """
+    Validate a caller-supplied fill time, defaulting to the current time
+    
+    Fill times are kept naive, so timezone-aware ones are converted to naive
+    UTC. Called before an order changes any state, so a bad value cannot
+    leave a fill half-applied.
+    """
+    if now is None:
+        return datetime.now()
+    if not isinstance(now, datetime):
+        raise TypeError(f"now must be a datetime, not {type(now).__name__}")
+    if now.tzinfo is not None:
+        return now.astimezone(timezone.utc).replace(tzinfo=None)
+    return now
+
+
+@njit(cache=True)
+def match_pending(prices: np.ndarray, has_price: np.ndarray, order_type: np.ndarray,
+                  side: np.ndarray, limit_px: np.ndarray, status: np.ndarray,
+                  symbol_idx: np.ndarray):
+    """
+    Find pending orders that should fill at the given prices
+    
+    Market orders fill at the current price and limit orders at their limit
+    once the price crosses it. Other order types never match here. Orders
+    whose symbol has no price this tick are skipped.
+    
+    Returns:
+        Tuple of (fill mask, fill price per order)
+    """
+    m = status.shape[0]
+    fill = np.zeros(m, dtype=np.bool_)
+    fill_px = np.zeros(m)
+    for i in range(m):
+        if status[i] != _PENDING:
+            continue
+        s = symbol_idx[i]
+        if not has_price[s]:
+            continue
+        cur = prices[s]
+        if order_type[i] == _MARKET:
+            fill[i] = True
+            fill_px[i] = cur
+        elif order_type[i] == _LIMIT:
+            # A missing limit price is NaN, which never compares true
+            limit = limit_px[i]
+            if (side[i] == _BUY and cur <= limit) or (side[i] == _SELL and cur >= limit):
+                fill[i] = True
+                fill_px[i] = limit
+    return fill, fill_px
+
+
+def _match_pending_masks(prices: np.ndarray, has_price: np.ndarray, order_type: np.ndarray,
+                         side: np.ndarray, limit_px: np.ndarray, status: np.ndarray,
+                         symbol_idx: np.ndarray):
+    """
+    match_pending as whole-array boolean masks
+    
+    Without numba the kernel above runs as a plain Python loop, so this
+    version is used instead; it gives the same fills and fill prices.
+    """
+    cur = prices[symbol_idx]
+    live = (status == _PENDING) & has_price[symbol_idx]
+    market = live & (order_type == _MARKET)
+    # A missing limit price is NaN, which never compares true
+    limit = live & (order_type == _LIMIT) & (
+        ((side == _BUY) & (cur <= limit_px)) | ((side == _SELL) & (cur >= limit_px))
+    )
+    fill_px = np.where(market, cur, np.where(limit, limit_px, 0.0))
+    return market | limit, fill_px
+
+
+@njit(cache=True)
+def execute_fill(side: int, quantity: float, price: float, commission: float,
+                 cash: float, pos_qty: float, pos_avg: float, pos_px: float):
+    """
+    Cash and position after filling one order, without branching on the side
+    
+    Buys and sells differ only in the sign of the cash and share flows, so
+    both are computed with a direction of 1 - 2 * side: +1 for a buy (code
+    _BUY = 0) and -1 for a sell (_SELL = 1). Buys need
+    enough cash for the trade plus commission; sells need an open position
+    holding at least the order quantity.
+    
+    Returns:
+        Tuple of (accepted, cash, position quantity, average price, current
+        price, commission); the inputs come back unchanged if rejected
+    """
+    is_buy = side == _BUY
+    direction = 1.0 - 2.0 * side
+    trade_value = quantity * price
+    commission_cost = trade_value * commission
+    new_cash = cash - (direction * trade_value + commission_cost)
+    new_qty = pos_qty + direction * quantity
+    
+    ok = (is_buy and trade_value + commission_cost <= cash) or (
+        not is_buy and pos_qty > 0 and quantity <= pos_qty)
+    if not ok:
+        return False, cash, pos_qty, pos_avg, pos_px, commission_cost
+    
+    # Only buys move the average price; opening a position also marks it
+    opening = is_buy and pos_qty <= 0
+    if opening:
+        pos_avg = price
+        pos_px = price
+    elif is_buy:
+        pos_avg = (pos_avg * pos_qty + price * quantity) / new_qty
+    return True, new_cash, new_qty, pos_avg, pos_px, commission_cost
+
+
+@njit(cache=True)
+def execute_fills(slots: np.ndarray, side: np.ndarray, quantity: np.ndarray,
+                  price: np.ndarray, commission: float, cash: float, pos_qty: np.ndarray,
+                  pos_avg: np.ndarray, pos_px: np.ndarray):
+    """
+    Apply execute_fill to a batch of orders in sequence
+    
+    Each order sees the cash and positions left by the ones before it, exactly
+    as if they were executed one at a time. The position columns are updated
+    in place.
+    
+    Returns:
+        Tuple of (accepted mask, commission per order, final cash)
+    """
+    m = slots.shape[0]
+    ok = np.zeros(m, dtype=np.bool_)
+    comm = np.zeros(m)
+    for k in range(m):
+        i = slots[k]
+        accepted, cash, qty, avg, px, comm[k] = execute_fill(
+            side[k], quantity[k], price[k], commission, cash,
+            pos_qty[i], pos_avg[i], pos_px[i]
+        )
+        if accepted:
+            ok[k] = True
+            pos_qty[i] = qty
+            pos_avg[i] = avg
+            pos_px[i] = px
+    return ok, comm, cash
+
+
+@njit(cache=True)
+def summarize_positions(qty: np.ndarray, avg: np.ndarray, px: np.ndarray):
+    """
+    Market value, unrealized P&L and unrealized P&L percentage per position
+    
+    The array division follows NumPy rules, so a zero average price gives an
+    inf/NaN percentage rather than raising.
+    """
+    market_value = qty * px
+    price_change = px - avg
+    return market_value, price_change * qty, price_change / avg
+
+
+# Prefer the ahead-of-time builds of the kernels (see _kernels_aot) when they exist
+try:
+    from .paper_kernels import (
+        match_pending as _match_pending,
+        execute_fill as _execute_fill,
+        execute_fills as _execute_fills,
+        summarize_positions as _summarize_positions
+    )
+except ImportError:
+    _match_pending = match_pending if NUMBA_AVAILABLE else _match_pending_masks
+    _execute_fill = execute_fill
+    _execute_fills = execute_fills
+    _summarize_positions = summarize_positions
+
+
+def _grown(arr: np.ndarray, size: int) -> np.ndarray:
+    """Return arr, or a copy with at least double the capacity if size does not fit"""
+    if size <= len(arr):
+        return arr
+    out = np.zeros(max(size, 2 * len(arr)), dtype=arr.dtype)
+    out[:len(arr)] = arr
+    return out
+
+
+class PositionBook:
+    """
+    Positions stored as parallel arrays, one slot per symbol
+    
+    A symbol gets a slot the first time it is traded or ordered. Closing a
+    position zeroes its quantity but keeps the slot, so slot indices held by
+    the order arrays stay valid. Whoever writes qty, avg or px adds the slot
+    to changed, so records() only rebuilds those rows, and reports the fill
+    through filled() so open positions keep the order they were opened in.
+    """
+    
+    def __init__(self, capacity: int = 16):
+        self.sym_idx: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.qty = np.zeros(capacity)
+        self.avg = np.zeros(capacity)
+        self.px = np.zeros(capacity)
+        # Sequence number of the fill that last opened each slot, and whether
+        # every fill since then had an integer quantity
+        self.opened = np.zeros(capacity, dtype=np.int64)
+        self.int_qty = np.zeros(capacity, dtype=bool)
+        self._opens = 0
+        self.changed: Set[int] = set()
+        self._records: Dict[int, Dict] = {}
+    
+    def __len__(self) -> int:
+        return len(self.symbols)
+    
+    def slot(self, symbol: str) -> int:
+        """Slot index for symbol, allocating a new one if needed"""
+        i = self.sym_idx.get(symbol)
+        if i is None:
+            i = len(self.symbols)
+            self.sym_idx[symbol] = i
+            self.symbols.append(symbol)
+            self.qty = _grown(self.qty, i + 1)
+            self.avg = _grown(self.avg, i + 1)
+            self.px = _grown(self.px, i + 1)
+            self.opened = _grown(self.opened, i + 1)
+            self.int_qty = _grown(self.int_qty, i + 1)
+        return i
+    
+    def filled(self, slot: int, opening: bool, quantity: float):
+        """Record a fill's effect on the open order and quantity type of slot"""
+        integral = isinstance(quantity, _INT_TYPES)
+        if opening:
+            self._opens += 1
+            self.opened[slot] = self._opens
+            self.int_qty[slot] = integral
+        elif not integral:
+            self.int_qty[slot] = False
+    
+    def quantity(self, slot: int) -> float:
+        """Quantity held in slot, as an int if it was built from integer fills"""
+        q = float(self.qty[slot])
+        return int(q) if self.int_qty[slot] else q
+    
+    def open_slots(self) -> np.ndarray:
+        """Slot indices of positions with shares held, in the order they were opened"""
+        slots = np.flatnonzero(self.qty[:len(self.symbols)] > 0)
+        return slots[np.argsort(self.opened[slots], kind='stable')]
+    
+    def market_value(self) -> float:
+        """Combined market value of the open positions"""
+        slots = self.open_slots()
+        return float(np.dot(self.qty[slots], self.px[slots]))
+    
+    def records(self) -> List[Dict]:
+        """
+        One Position.to_dict record per open position
+        
+        Records are cached per slot and only the changed slots are rebuilt,
+        with summarize_positions computing their derived values in one pass.
+        Callers get shallow copies, so changing a returned record does not
+        leak into the cache.
+        """
+        slots = self.open_slots().tolist()
+        records = self._records
+        stale = [i for i in slots if i in self.changed or i not in records]
+        if stale:
+            qty = self.qty[stale]
+            avg = self.avg[stale]
+            px = self.px[stale]
+            market_value, pnl, pnl_pct = _summarize_positions(qty, avg, px)
+            columns = zip(qty.tolist(), avg.tolist(), px.tolist(), market_value.tolist(),
+                          pnl.tolist(), pnl_pct.tolist())
+            for i, (q, a, p, mv, upnl, pct) in zip(stale, columns):
+                records[i] = {
+                    "symbol": self.symbols[i],
+                    "quantity": int(q) if self.int_qty[i] else q,
+                    "avg_price": a,
+                    "current_price": p,
+                    "market_value": mv,
+                    "unrealized_pnl": upnl,
+                    "unrealized_pnl_pct": pct
+                }
+        self.changed.clear()
+        return [dict(records[i]) for i in slots]
+
+
+class LimitIndex:
+    """
+    Pending limit orders per book slot and side, sorted by limit price
+    
+    A price update only needs the orders its price crosses: buys limited at
+    or above it and sells limited at or below it. Both are a contiguous run
+    found by binary search, so resting orders the price does not reach are
+    never looked at. Orders leave the index when triggered or cancelled;
+    ones filled directly (e.g. via process_limit_order) are dropped the next
+    time their price is crossed.
+    """
+    
+    def __init__(self):
+        self._levels: Dict[Tuple[int, int], Tuple[List[float], List[int]]] = {}
+    
+    def add(self, slot: int, side: int, limit: float, order_idx: int):
+        """Index a pending limit order"""
+        prices, orders = self._levels.setdefault((slot, side), ([], []))
+        k = bisect_right(prices, limit)
+        prices.insert(k, limit)
+        orders.insert(k, order_idx)
+    
+    def remove(self, slot: int, side: int, limit: float, order_idx: int):
+        """Drop an order from the index, if it is still there"""
+        level = self._levels.get((slot, side))
+        if level is None:
+            return
+        prices, orders = level
+        for k in range(bisect_left(prices, limit), bisect_right(prices, limit)):
+            if orders[k] == order_idx:
+                del prices[k]
+                del orders[k]
+                return
+    
+    def triggered(self, slot: int, price: float) -> List[int]:
+        """Remove and return the orders in slot whose limit the price crosses"""
+        # A NaN price never crosses a limit
+        if price != price:
+            return []
+        out: List[int] = []
+        level = self._levels.get((slot, _BUY))
+        if level:
+            prices, orders = level
+            k = bisect_left(prices, price)
+            out += orders[k:]
+            del prices[k:], orders[k:]
+        level = self._levels.get((slot, _SELL))
+        if level:
+            prices, orders = level
+            k = bisect_right(prices, price)
+            out += orders[:k]
+            del prices[:k], orders[:k]
+        return out
+
+
+class PositionView:
+    """
+    Live, read-only view of one position book slot
+    
+    Has the same attributes and to_dict as Position, but reads them from the
+    book's arrays on access, so it reflects later fills and price updates.
+    """
+    
+    __slots__ = ('_book', '_slot')
+    
+    def __init__(self, book: PositionBook, slot: int):
+        self._book = book
+        self._slot = slot
+    
+    @property
+    def symbol(self) -> str:
+        return self._book.symbols[self._slot]
+    
+    @property
+    def quantity(self) -> float:
+        return self._book.quantity(self._slot)
+    
+    @property
+    def avg_price(self) -> float:
+        return float(self._book.avg[self._slot])
+    
+    @property
+    def current_price(self) -> float:
+        return float(self._book.px[self._slot])
+    
+    @property
+    def market_value(self) -> float:
+        """Current market value of position"""
+        return self.quantity * self.current_price
+    
+    @property
+    def unrealized_pnl(self) -> float:
+        """Unrealized profit/loss"""
+        return (self.current_price - self.avg_price) * self.quantity
+    
+    @property
+    def unrealized_pnl_pct(self) -> float:
+        """Unrealized profit/loss percentage"""
+        return (self.current_price - self.avg_price) / self.avg_price
+    
+    def to_dict(self) -> Dict:
+        """Convert position to dictionary"""
+        return Position(self.symbol, self.quantity, self.avg_price, self.current_price).to_dict()
+    
+    def __repr__(self) -> str:
+        return (f"PositionView(symbol={self.symbol!r}, quantity={self.quantity!r}, "
+                f"avg_price={self.avg_price!r}, current_price={self.current_price!r})")
+
+
 class PaperTrader:
     """Paper trading engine"""
     
@@ -113,11 +556,73 @@ class PaperTrader:
         self.initial_capital = initial_capital
         self.cash = initial_capital
         self.commission = commission
-        self.positions: Dict[str, Position] = {}
+        self._book = PositionBook()
         self.orders: List[Order] = []
-        self.trade_history: List[Dict] = []
         self.order_counter = 0
         
+        # Running market value of all positions, kept in step with every fill
+        # and price update; reset exactly to zero once nothing is held
+        self._positions_value = 0.0
+        self._open_positions = 0
+        
+        # Fills as parallel arrays (one element per trade); trade_history
+        # builds the per-trade dicts only when it is read
+        self._th_n = 0
+        self._th_ts = np.zeros(1024, dtype=np.int64)
+        self._th_sym = np.zeros(1024, dtype=np.int32)
+        self._th_side = np.zeros(1024, dtype=np.int8)
+        self._th_qty = np.zeros(1024)
+        self._th_int = np.zeros(1024, dtype=bool)
+        self._th_px = np.zeros(1024)
+        self._th_comm = np.zeros(1024)
+        self._th_order_ids: List[str] = []
+        self._trade_history: Optional[List[Dict]] = None
+        
+        # Order lookup by ID; pending limit orders are indexed by price and
+        # every other pending order is checked on each price update
+        self._order_index: Dict[str, int] = {}
+        self._pending_indices: List[int] = []
+        self._limits = LimitIndex()
+        
+        # Order fields used for matching, parallel to self.orders
+        self._ord_sym = np.zeros(16, dtype=np.int64)
+        self._ord_side = np.zeros(16, dtype=np.int8)
+        self._ord_type = np.zeros(16, dtype=np.int8)
+        self._ord_status = np.zeros(16, dtype=np.int8)
+        self._ord_limit = np.zeros(16)
+    
+    @property
+    def positions(self) -> Dict[str, PositionView]:
+        """Open positions by symbol, as live views of the position book"""
+        book = self._book
+        return {book.symbols[i]: PositionView(book, i) for i in book.open_slots().tolist()}
+    
+    @property
+    def trade_history(self) -> List[Dict]:
+        """Executed trades, materialized from the trade arrays on first access"""
+        if self._trade_history is None:
+            n = self._th_n
+            symbols = self._book.symbols
+            qty = self._th_qty[:n].astype(object)
+            integral = self._th_int[:n]
+            qty[integral] = self._th_qty[:n][integral].astype(np.int64)
+            columns = zip(self._th_order_ids, self._th_ts[:n].tolist(), self._th_sym[:n].tolist(),
+                          self._th_side[:n].tolist(), qty.tolist(),
+                          self._th_px[:n].tolist(), self._th_comm[:n].tolist())
+            self._trade_history = [
+                {
+                    "timestamp": (_EPOCH + (ts // 1000) * _ONE_US).isoformat(),
+                    "order_id": order_id,
+                    "symbol": symbols[sym],
+                    "side": _SIDE_VALUES[side],
+                    "quantity": qty,
+                    "price": px,
+                    "commission": comm
+                }
+                for order_id, ts, sym, side, qty, px, comm in columns
+            ]
+        return self._trade_history
+    
     def submit_order(self, symbol: str, side: OrderSide, order_type: OrderType,
                     quantity: float, price: Optional[float] = None,
                     stop_price: Optional[float] = None) -> Order:
@@ -136,7 +641,7 @@ class PaperTrader:
             Order object
         """
         self.order_counter += 1
-        order_id = f"ORDER_{self.order_counter}_{datetime.now().timestamp()}"
+        order_id = f"ORDER_{self.order_counter}_{time.monotonic_ns()}"
         
         order = Order(
             order_id=order_id,
@@ -148,89 +653,277 @@ class PaperTrader:
             stop_price=stop_price
         )
         
-        self.orders.append(order)
+        self._append_order(order)
         return order
     
-    def execute_order(self, order: Order, execution_price: float) -> bool:
+    def _append_order(self, order: Order):
+        """Track a new order in self.orders and the matching arrays"""
+        i = len(self.orders)
+        self.orders.append(order)
+        self._order_index[order.order_id] = i
+        if i == len(self._ord_sym):
+            self._ord_sym = _grown(self._ord_sym, i + 1)
+            self._ord_side = _grown(self._ord_side, i + 1)
+            self._ord_type = _grown(self._ord_type, i + 1)
+            self._ord_status = _grown(self._ord_status, i + 1)
+            self._ord_limit = _grown(self._ord_limit, i + 1)
+        self._ord_sym[i] = self._book.slot(order.symbol)
+        self._ord_side[i] = _SIDE_CODES[order.side]
+        self._ord_type[i] = _TYPE_CODES[order.order_type]
+        self._ord_status[i] = _STATUS_CODES[order.status]
+        self._ord_limit[i] = np.nan if order.price is None else order.price
+        if order.status is _PENDING_STATUS:
+            if order.order_type is not OrderType.LIMIT:
+                self._pending_indices.append(i)
+            elif order.price is not None and order.price == order.price:
+                # Limit orders without a (non-NaN) price can never fill
+                self._limits.add(int(self._ord_sym[i]), int(self._ord_side[i]), order.price, i)
+    
+    def _set_status(self, order: Order, status: OrderStatus):
+        """Set an order's status, keeping the status array in step for tracked orders"""
+        order.status = status
+        i = self._order_index.get(order.order_id)
+        if i is not None and self.orders[i] is order:
+            self._ord_status[i] = _STATUS_CODES[status]
+    
+    def execute_order(self, order: Order, execution_price: float,
+                      now: Optional[datetime] = None) -> bool:
         """
         Execute an order at the given price
         
         Args:
             order: Order to execute
             execution_price: Price at which to execute
+            now: Fill time, defaults to the current time
             
         Returns:
             True if execution successful
         """
-        if order.status != OrderStatus.PENDING:
+        if order.status is not _PENDING_STATUS:
             return False
+        now = _fill_time(now)
         
-        # Calculate cost/proceeds including commission
-        trade_value = order.quantity * execution_price
-        commission_cost = trade_value * self.commission
+        # Resolve the symbol to its book slot once, here at the API boundary;
+        # buys may open a new slot, a sell of an unknown symbol has nothing to sell
+        book = self._book
+        if order.side is _BUY_SIDE:
+            slot = book.slot(order.symbol)
+        else:
+            slot = book.sym_idx.get(order.symbol)
+        if slot is None:
+            self._set_status(order, _REJECTED_STATUS)
+            return False
+        side = _BUY if order.side is _BUY_SIDE else _SELL
+        return self._execute(order, slot, side, execution_price, now)
+    
+    def _execute(self, order: Order, slot: int, side: int, execution_price: float,
+                 now: datetime) -> bool:
+        """execute_order for a pending order with its slot, side code and fill time resolved"""
+        book = self._book
+        old_qty = book.qty[slot]
+        old_px = book.px[slot]
+        ok, cash, qty, avg, px, commission_cost = _execute_fill(
+            side, order.quantity, execution_price, self.commission,
+            self.cash, old_qty, book.avg[slot], old_px
+        )
+        if not ok:
+            self._set_status(order, _REJECTED_STATUS)
+            return False
         
-        if order.side == OrderSide.BUY:
-            total_cost = trade_value + commission_cost
-            
-            # Check if sufficient cash
-            if total_cost > self.cash:
-                order.status = OrderStatus.REJECTED
-                return False
-            
-            # Execute buy
-            self.cash -= total_cost
-            self._add_to_position(order.symbol, order.quantity, execution_price)
-            
-        else:  # SELL
-            # Check if position exists
-            if order.symbol not in self.positions:
-                order.status = OrderStatus.REJECTED
-                return False
-            
-            position = self.positions[order.symbol]
-            
-            # Check if sufficient shares
-            if order.quantity > position.quantity:
-                order.status = OrderStatus.REJECTED
-                return False
-            
-            # Execute sell
-            proceeds = trade_value - commission_cost
-            self.cash += proceeds
-            self._remove_from_position(order.symbol, order.quantity)
+        self.cash = cash
+        book.qty[slot] = qty
+        book.avg[slot] = avg
+        book.px[slot] = px
+        book.changed.add(slot)
+        book.filled(slot, side == _BUY and old_qty <= 0, order.quantity)
+        self._revalue(float(qty * px - old_qty * old_px), int(qty > 0) - int(old_qty > 0))
         
         # Update order status
-        order.status = OrderStatus.FILLED
+        self._set_status(order, _FILLED_STATUS)
         order.filled_quantity = order.quantity
         order.filled_price = execution_price
-        order.filled_at = datetime.now()
-        
-        # Record trade
-        self.trade_history.append({
-            "timestamp": datetime.now().isoformat(),
-            "order_id": order.order_id,
-            "symbol": order.symbol,
-            "side": order.side.value,
-            "quantity": order.quantity,
-            "price": execution_price,
-            "commission": commission_cost
-        })
+        order.filled_at = now
         
+        self._record_trade(order, slot, side, execution_price, commission_cost, now)
         return True
     
-    def process_market_order(self, order: Order, current_price: float) -> bool:
+    def _record_trade(self, order: Order, slot: int, side: int, price: float,
+                      commission_cost: float, now: datetime):
+        """Append a fill to the trade arrays, doubling their capacity when full"""
+        k = self._th_n
+        if k == len(self._th_ts):
+            self._th_ts = _grown(self._th_ts, k + 1)
+            self._th_sym = _grown(self._th_sym, k + 1)
+            self._th_side = _grown(self._th_side, k + 1)
+            self._th_qty = _grown(self._th_qty, k + 1)
+            self._th_int = _grown(self._th_int, k + 1)
+            self._th_px = _grown(self._th_px, k + 1)
+            self._th_comm = _grown(self._th_comm, k + 1)
+        self._th_ts[k] = ((now - _EPOCH) // _ONE_US) * 1000
+        self._th_sym[k] = slot
+        self._th_side[k] = side
+        self._th_qty[k] = order.quantity
+        self._th_int[k] = isinstance(order.quantity, _INT_TYPES)
+        self._th_px[k] = price
+        self._th_comm[k] = commission_cost
+        self._th_order_ids.append(order.order_id)
+        self._th_n = k + 1
+        self._trade_history = None
+    
+    def execute_batch(self, symbols: Sequence[str], quantities: Sequence[float],
+                      prices: Sequence[float],
+                      side: Union[OrderSide, Sequence[OrderSide]] = OrderSide.BUY,
+                      now: Optional[datetime] = None) -> List[Order]:
+        """
+        Submit and execute a batch of market orders in one call
+        
+        Equivalent to submit_order followed by execute_order for each entry in
+        turn, but the cash and position updates run in one compiled pass and
+        the fills are appended to the trade arrays together.
+        
+        Args:
+            symbols: Trading symbol per order (a sequence or string array)
+            quantities: Number of shares per order
+            prices: Execution price per order
+            side: Buy or sell, for every order or one per order
+            now: Fill time, defaults to the current time
+            
+        Returns:
+            The new orders, each filled or rejected
+        """
+        now = _fill_time(now)
+        if isinstance(symbols, np.ndarray):
+            # Plain str keys, not numpy scalars, end up in the book and orders
+            symbols = symbols.tolist()
+        m = len(symbols)
+        sides = [side] * m if isinstance(side, OrderSide) else list(side)
+        # The orders keep the quantities as given, like submit_order
+        quantity_list = (quantities.tolist() if isinstance(quantities, np.ndarray)
+                         else list(quantities))
+        qty = np.asarray(quantities, dtype=np.float64)
+        px = np.asarray(prices, dtype=np.float64)
+        # Check the lengths before any symbol is registered in the book
+        if not len(quantity_list) == len(px) == len(sides) == m:
+            raise ValueError(
+                f"symbols, quantities, prices and side must have the same length, got "
+                f"{m}, {len(quantity_list)}, {len(px)} and {len(sides)}"
+            )
+        book = self._book
+        # Every symbol gets a slot, as with submit_order
+        slots = np.fromiter((book.slot(symbol) for symbol in symbols), dtype=np.int64, count=m)
+        side_codes = np.fromiter((_BUY if s is _BUY_SIDE else _SELL for s in sides),
+                                 dtype=np.int8, count=m)
+        
+        touched = np.unique(slots)
+        held = dict(zip(touched.tolist(), book.qty[touched].tolist()))
+        value_before = float(np.dot(book.qty[touched], book.px[touched]))
+        open_before = int(np.count_nonzero(book.qty[touched] > 0))
+        ok, comm, cash = _execute_fills(slots, side_codes, qty, px, float(self.commission),
+                                        float(self.cash), book.qty, book.avg, book.px)
+        self.cash = cash
+        self._revalue(float(np.dot(book.qty[touched], book.px[touched])) - value_before,
+                      int(np.count_nonzero(book.qty[touched] > 0)) - open_before)
+        book.changed.update(touched.tolist())
+        
+        orders = []
+        for symbol, slot, s, quantity, price, filled in zip(symbols, slots.tolist(), sides,
+                                                            quantity_list, px.tolist(),
+                                                            ok.tolist()):
+            if filled:
+                # Replay the quantity held per slot to see which fills open a position
+                before = held[slot]
+                held[slot] = before + quantity if s is _BUY_SIDE else before - quantity
+                book.filled(slot, s is _BUY_SIDE and before <= 0, quantity)
+            self.order_counter += 1
+            order = Order(
+                order_id=f"ORDER_{self.order_counter}_{time.monotonic_ns()}",
+                symbol=symbol,
+                side=s,
+                order_type=OrderType.MARKET,
+                quantity=quantity,
+                status=_FILLED_STATUS if filled else _REJECTED_STATUS,
+                created_at=now
+            )
+            if filled:
+                order.filled_quantity = quantity
+                order.filled_price = price
+                order.filled_at = now
+            self._append_order(order)
+            orders.append(order)
+        
+        fills = np.flatnonzero(ok).tolist()
+        self._record_trades([orders[k].order_id for k in fills], slots[fills],
+                            side_codes[fills], qty[fills],
+                            [isinstance(quantity_list[k], _INT_TYPES) for k in fills],
+                            px[fills], comm[fills], now)
+        return orders
+    
+    def rebalance(self, deltas: Dict[str, float], prices: Dict[str, float],
+                  now: Optional[datetime] = None) -> List[Order]:
+        """
+        Apply signed position changes as one batch of market orders
+        
+        Negative deltas become sells and positive ones buys; all of them go
+        through execute_batch in a single pass. Sells run first so their
+        proceeds are available to the buys. Zero deltas are skipped.
+        
+        Args:
+            deltas: Signed share change per symbol
+            prices: Execution price per symbol
+            now: Fill time, defaults to the current time
+        
+        Returns:
+            The new orders, sells first, each filled or rejected
+        """
+        changes = sorted(((symbol, delta) for symbol, delta in deltas.items() if delta),
+                         key=lambda item: item[1] > 0)
+        return self.execute_batch(
+            [symbol for symbol, _ in changes],
+            [abs(delta) for _, delta in changes],
+            [prices[symbol] for symbol, _ in changes],
+            [_BUY_SIDE if delta > 0 else _SELL_SIDE for _, delta in changes],
+            now
+        )
+    
+    def _record_trades(self, order_ids: List[str], slots: np.ndarray, sides: np.ndarray,
+                       quantities: np.ndarray, integral: List[bool], prices: np.ndarray,
+                       commissions: np.ndarray, now: datetime):
+        """Append several fills sharing one timestamp to the trade arrays"""
+        k = self._th_n
+        end = k + len(order_ids)
+        self._th_ts = _grown(self._th_ts, end)
+        self._th_sym = _grown(self._th_sym, end)
+        self._th_side = _grown(self._th_side, end)
+        self._th_qty = _grown(self._th_qty, end)
+        self._th_int = _grown(self._th_int, end)
+        self._th_px = _grown(self._th_px, end)
+        self._th_comm = _grown(self._th_comm, end)
+        self._th_ts[k:end] = ((now - _EPOCH) // _ONE_US) * 1000
+        self._th_sym[k:end] = slots
+        self._th_side[k:end] = sides
+        self._th_qty[k:end] = quantities
+        self._th_int[k:end] = integral
+        self._th_px[k:end] = prices
+        self._th_comm[k:end] = commissions
+        self._th_order_ids.extend(order_ids)
+        self._th_n = end
+        self._trade_history = None
+    
+    def process_market_order(self, order: Order, current_price: float,
+                             now: Optional[datetime] = None) -> bool:
         """Process a market order immediately"""
-        return self.execute_order(order, current_price)
+        return self.execute_order(order, current_price, now)
     
-    def process_limit_order(self, order: Order, current_price: float) -> bool:
+    def process_limit_order(self, order: Order, current_price: float,
+                            now: Optional[datetime] = None) -> bool:
         """Process a limit order if price conditions are met"""
         if order.price is None:
             return False
         
-        if order.side == OrderSide.BUY and current_price <= order.price:
-            return self.execute_order(order, order.price)
-        elif order.side == OrderSide.SELL and current_price >= order.price:
-            return self.execute_order(order, order.price)
+        if order.side is _BUY_SIDE and current_price <= order.price:
+            return self.execute_order(order, order.price, now)
+        elif order.side is _SELL_SIDE and current_price >= order.price:
+            return self.execute_order(order, order.price, now)
         
         return False
     
@@ -241,79 +934,154 @@ class PaperTrader:
         Args:
             prices: Dictionary mapping symbols to current prices
         """
-        # Update position prices
-        for symbol, position in self.positions.items():
-            if symbol in prices:
-                position.current_price = prices[symbol]
-        
-        # Process pending orders
-        for order in self.orders:
-            if order.status != OrderStatus.PENDING:
-                continue
-            
-            if order.symbol not in prices:
-                continue
-            
-            current_price = prices[order.symbol]
-            
-            if order.order_type == OrderType.MARKET:
-                self.process_market_order(order, current_price)
-            elif order.order_type == OrderType.LIMIT:
-                self.process_limit_order(order, current_price)
-    
-    def _add_to_position(self, symbol: str, quantity: float, price: float):
-        """Add shares to a position"""
-        if symbol in self.positions:
-            position = self.positions[symbol]
-            total_cost = position.avg_price * position.quantity + price * quantity
-            position.quantity += quantity
-            position.avg_price = total_cost / position.quantity
-        else:
-            self.positions[symbol] = Position(
-                symbol=symbol,
-                quantity=quantity,
-                avg_price=price,
-                current_price=price
-            )
+        # Symbols never traded or ordered have no slot and nothing to update
+        sym_idx = self._book.sym_idx
+        slots = np.fromiter((sym_idx.get(symbol, -1) for symbol in prices),
+                            dtype=np.int64, count=len(prices))
+        values = np.fromiter(prices.values(), dtype=np.float64, count=len(prices))
+        known = slots >= 0
+        self.update_market_data_vec(slots[known], values[known])
+    
+    def symbol_ids(self, symbols: Sequence[str]) -> np.ndarray:
+        """
+        Position book slot per symbol, for use with update_market_data_vec
+        
+        Symbols seen for the first time get a new slot.
+        """
+        book = self._book
+        return np.fromiter((book.slot(symbol) for symbol in symbols), dtype=np.int64,
+                           count=len(symbols))
     
-    def _remove_from_position(self, symbol: str, quantity: float):
-        """Remove shares from a position"""
-        if symbol not in self.positions:
+    def update_market_data_vec(self, sym_ids: np.ndarray, prices: np.ndarray):
+        """
+        Update market data from parallel arrays and process pending orders
+        
+        Same as update_market_data, for callers that already hold prices as
+        arrays; no per-symbol lookup is done.
+        
+        Args:
+            sym_ids: Slots from symbol_ids(), one per price; a slot given
+                more than once takes its last price
+            prices: Current price per slot
+        """
+        book = self._book
+        slots = np.asarray(sym_ids, dtype=np.int64)
+        values = np.asarray(prices, dtype=np.float64)
+        # Keep the last occurrence of each slot, so every slot is revalued
+        # (and checked against its limit orders) once
+        unique, last = np.unique(slots[::-1], return_index=True)
+        if len(unique) < len(slots):
+            keep = len(slots) - 1 - last
+            slots = slots[keep]
+            values = values[keep]
+        
+        # Scatter the prices into the position book slots; the work scales
+        # with the number of prices, not the number of positions
+        old_px = book.px[slots]
+        book.px[slots] = values
+        book.changed.update(slots.tolist())
+        self._revalue(float(np.dot(values - old_px, book.qty[slots])), 0)
+        
+        # Only the limit orders each new price crosses are candidates
+        candidates = self._pending_indices
+        for slot, price in zip(slots.tolist(), values.tolist()):
+            triggered = self._limits.triggered(slot, price)
+            if triggered:
+                candidates = candidates + triggered
+        if not candidates:
             return
+        has_px = np.zeros(len(book), dtype=bool)
+        has_px[slots] = True
+        
+        # Select candidates whose trigger condition holds; orders that are
+        # already filled, cancelled or rejected are not scanned at all
+        idx = np.sort(np.array(candidates, dtype=np.int64))
+        # Order.status is a public field, so read it back into the status array
+        # first; an order cancelled by setting it directly must not fill
+        orders = self.orders
+        self._ord_status[idx] = np.fromiter((_STATUS_CODES[orders[k].status] for k in idx.tolist()),
+                                            dtype=np.int8, count=len(idx))
+        fill, fill_px = _match_pending(book.px, has_px, self._ord_type[idx], self._ord_side[idx],
+                                       self._ord_limit[idx], self._ord_status[idx],
+                                       self._ord_sym[idx])
+        
+        # Execute in submission order, since each fill changes cash and positions;
+        # every fill in this tick shares one timestamp
+        now = datetime.now()
+        filled = idx[fill]
+        for k, slot, side, price in zip(filled.tolist(), self._ord_sym[filled].tolist(),
+                                        self._ord_side[filled].tolist(), fill_px[fill].tolist()):
+            self._execute(orders[k], slot, side, price, now)
         
-        position = self.positions[symbol]
-        position.quantity -= quantity
+        self._pending_indices = idx[self._ord_status[idx] == _PENDING].tolist()
+    
+    def _revalue(self, value_change: float, open_change: int):
+        """
+        Apply a change in positions market value and open position count
         
-        if position.quantity <= 0:
-            del self.positions[symbol]
+        Call after the book has been updated. A NaN or infinite price makes
+        the change non-finite, and the running sum would never recover from
+        it, so the value is then recomputed from the book instead.
+        """
+        self._open_positions += open_change
+        if self._open_positions:
+            value = self._positions_value + value_change
+            if not math.isfinite(value):
+                value = self._book.market_value()
+            self._positions_value = value
+        else:
+            # Nothing held: drop any rounding left over from the running sum
+            self._positions_value = 0.0
     
     def get_portfolio_value(self) -> float:
         """Calculate total portfolio value"""
-        positions_value = sum(pos.market_value for pos in self.positions.values())
-        return self.cash + positions_value
+        return self.cash + self._positions_value
     
     def get_portfolio_summary(self) -> Dict:
         """Get portfolio summary"""
-        portfolio_value = self.get_portfolio_value()
+        positions_value = self._positions_value
+        positions = self._book.records()
+        portfolio_value = self.cash + positions_value
         total_pnl = portfolio_value - self.initial_capital
         total_return = total_pnl / self.initial_capital
         
         return {
             "cash": self.cash,
-            "positions_value": sum(pos.market_value for pos in self.positions.values()),
+            "positions_value": positions_value,
             "portfolio_value": portfolio_value,
             "total_pnl": total_pnl,
             "total_return": total_return,
-            "positions": [pos.to_dict() for pos in self.positions.values()],
-            "num_positions": len(self.positions),
+            "positions": positions,
+            "num_positions": len(positions),
             "num_orders": len(self.orders),
-            "num_trades": len(self.trade_history)
+            "num_trades": self._th_n
         }
     
+    def to_json(self) -> str:
+        """
+        Portfolio summary and trade history as one JSON document
+        
+        Encoded with orjson when it is installed (the api extra), otherwise
+        with the standard library encoder.
+        """
+        payload = {
+            "summary": self.get_portfolio_summary(),
+            "trades": self.trade_history
+        }
+        if orjson is not None:
+            return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+        return json.dumps(payload)
+    
     def cancel_order(self, order_id: str) -> bool:
         """Cancel a pending order"""
-        for order in self.orders:
-            if order.order_id == order_id and order.status == OrderStatus.PENDING:
-                order.status = OrderStatus.CANCELLED
-                return True
+        i = self._order_index.get(order_id)
+        if i is None:
+            return False
+        
+        order = self.orders[i]
+        if order.status is _PENDING_STATUS:
+            self._set_status(order, _CANCELLED_STATUS)
+            if order.order_type is OrderType.LIMIT and order.price is not None:
+                self._limits.remove(int(self._ord_sym[i]), int(self._ord_side[i]), order.price, i)
+            return True
         return False
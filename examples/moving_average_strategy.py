@@ -6,7 +6,22 @@ the long-term moving average, and sell signals when it crosses below.
 
 import pandas as pd
 import numpy as np
-from core import BacktestEngine, StrategyOptimizer
+from core import BacktestEngine
+from core._numba import njit, prange
+
+
+def sma(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average from a running sum, NaN until the window fills
+    
+    Each mean is a difference of two cumulative sums, so the whole series
+    costs one pass over the prices regardless of the window length.
+    """
+    cs = np.concatenate(([0.0], np.cumsum(close)))
+    out = np.full(len(close), np.nan)
+    if window <= len(close):
+        out[window - 1:] = (cs[window:] - cs[:-window]) / window
+    return out
 
 
 def moving_average_crossover(data: pd.DataFrame, params: dict) -> pd.Series:
@@ -24,19 +39,161 @@ def moving_average_crossover(data: pd.DataFrame, params: dict) -> pd.Series:
     long_window = params.get('long_window', 50)
     
     # Calculate moving averages
-    short_ma = data['close'].rolling(window=short_window).mean()
-    long_ma = data['close'].rolling(window=long_window).mean()
+    close = data['close'].to_numpy(dtype=np.float64)
+    short_ma = sma(close, short_window)
+    long_ma = sma(close, long_window)
+    
+    # Buy when short MA is above long MA, sell when below; NaN compares false,
+    # so bars before the long window fills are holds
+    signals = np.where(short_ma > long_ma, 1, np.where(short_ma < long_ma, -1, 0))
+    
+    return pd.Series(signals, index=data.index)
+
+
+@njit(cache=True)
+def run_ma_backtest(close: np.ndarray, short_window: int, long_window: int,
+                    initial_capital: float, commission: float):
+    """
+    Crossover backtest fused into a single pass over the prices
     
-    # Generate signals
-    signals = pd.Series(0, index=data.index)
+    Moving averages, fills and the equity curve are updated bar by bar from
+    running window sums, with the same trading rules as BacktestEngine.
+    
+    Returns:
+        Tuple of (equity curve, trades, final capital); trades has one row
+        per round trip: entry bar, exit bar, quantity, P&L
+    """
+    n = close.shape[0]
+    equity = np.empty(n)
+    trades = np.empty((n // 2 + 1, 4))
+    n_trades = 0
+    capital = initial_capital
+    in_position = False
+    entry_bar = 0
+    entry_px = 0.0
+    qty = 0
+    short_sum = 0.0
+    long_sum = 0.0
+    # Both means exist from the longer window on; earlier bars are holds
+    first = max(short_window, long_window) - 1
     
-    # Buy when short MA crosses above long MA
-    signals[short_ma > long_ma] = 1
+    for i in range(n):
+        px = close[i]
+        equity[i] = capital + (px - entry_px) * qty if in_position else capital
+        
+        short_sum += px
+        long_sum += px
+        if i >= short_window:
+            short_sum -= close[i - short_window]
+        if i >= long_window:
+            long_sum -= close[i - long_window]
+        if i < first:
+            continue
+        short_ma = short_sum / short_window
+        long_ma = long_sum / long_window
+        
+        if short_ma > long_ma and not in_position:
+            quantity = int(capital * 0.95 / px)
+            cost = quantity * px * (1 + commission)
+            if cost <= capital:
+                capital -= cost
+                in_position = True
+                entry_bar = i
+                entry_px = px
+                qty = quantity
+        elif short_ma < long_ma and in_position:
+            trades[n_trades, 0] = entry_bar
+            trades[n_trades, 1] = i
+            trades[n_trades, 2] = qty
+            trades[n_trades, 3] = (px - entry_px) * qty
+            n_trades += 1
+            capital += qty * px * (1 - commission)
+            in_position = False
+            qty = 0
     
-    # Sell when short MA crosses below long MA
-    signals[short_ma < long_ma] = -1
+    # Close any open position at the end
+    if in_position:
+        px = close[n - 1]
+        trades[n_trades, 0] = entry_bar
+        trades[n_trades, 1] = n - 1
+        trades[n_trades, 2] = qty
+        trades[n_trades, 3] = (px - entry_px) * qty
+        n_trades += 1
+        capital += qty * px * (1 - commission)
     
-    return signals
+    return equity, trades[:n_trades], capital
+
+
+@njit(parallel=True, cache=True)
+def sweep(close: np.ndarray, shorts: np.ndarray, longs: np.ndarray,
+          initial_capital: float, commission: float) -> np.ndarray:
+    """
+    Backtest every (short, long) window pair in one compiled call
+    
+    Each pair runs the fused run_ma_backtest pass, with the parameter
+    pairs spread across cores.
+    
+    Returns:
+        Array of shape (n_pairs, 6): total return, trades, wins, losses,
+        total P&L and max drawdown per pair
+    """
+    out = np.empty((shorts.shape[0], 6))
+    for k in prange(shorts.shape[0]):
+        equity, trades, capital = run_ma_backtest(close, shorts[k], longs[k],
+                                                  initial_capital, commission)
+        pnl = trades[:, 3]
+        peak = -np.inf
+        max_dd = 0.0
+        for value in equity:
+            if value > peak:
+                peak = value
+            if peak > 0.0 and (peak - value) / peak > max_dd:
+                max_dd = (peak - value) / peak
+        out[k, 0] = (capital - initial_capital) / initial_capital
+        out[k, 1] = trades.shape[0]
+        out[k, 2] = (pnl > 0).sum()
+        out[k, 3] = (pnl < 0).sum()
+        out[k, 4] = pnl.sum()
+        out[k, 5] = max_dd
+    return out
+
+
+def grid_search_crossover(data: pd.DataFrame, param_grid: dict,
+                          engine: BacktestEngine) -> dict:
+    """
+    Grid search for the crossover strategy on top of the compiled sweep
+    
+    Returns the same layout as StrategyOptimizer.grid_search for the
+    metrics the sweep computes.
+    """
+    pairs = [(short_w, long_w) for short_w in param_grid['short_window']
+             for long_w in param_grid['long_window']]
+    out = sweep(data['close'].to_numpy(dtype=np.float64),
+                np.array([short_w for short_w, _ in pairs], dtype=np.int64),
+                np.array([long_w for _, long_w in pairs], dtype=np.int64),
+                float(engine.initial_capital), float(engine.commission))
+    
+    all_results = []
+    for (short_window, long_window), row in zip(pairs, out.tolist()):
+        total_return, trades, wins, losses, total_pnl, max_dd = row
+        all_results.append({
+            'params': {'short_window': short_window, 'long_window': long_window},
+            'total_return': total_return,
+            'total_trades': int(trades),
+            'winning_trades': int(wins),
+            'losing_trades': int(losses),
+            'total_pnl': total_pnl,
+            'win_rate': wins / trades if trades else 0.0,
+            'max_drawdown': max_dd
+        })
+    
+    best = max(all_results, key=lambda r: r['total_return'])
+    return {
+        'best_params': best['params'],
+        'best_metric': best['total_return'],
+        'best_results': best,
+        'all_results': all_results
+    }
 
 
 def run_example():
@@ -91,20 +248,15 @@ def run_example():
     print(f"Max Drawdown: {results['max_drawdown']:.2%}")
     print("="*50)
     
-    # Now optimize the strategy
+    # Now optimize the strategy; the whole grid runs as one compiled sweep
     print("\n\nOptimizing strategy parameters...")
-    optimizer = StrategyOptimizer(engine, data)
     
     param_grid = {
         'short_window': [10, 15, 20, 25],
         'long_window': [40, 50, 60, 70]
     }
     
-    optimization_results = optimizer.grid_search(
-        moving_average_crossover,
-        param_grid,
-        metric='total_return'
-    )
+    optimization_results = grid_search_crossover(data, param_grid, engine)
     
     print("\n" + "="*50)
     print("OPTIMIZATION RESULTS")
@@ -3,6 +3,8 @@ Example: Options Greeks Calculations
 Demonstrates how to calculate options Greeks for different scenarios
 """
 
+import numpy as np
+
 from core import OptionsGreeks
 
 
@@ -136,24 +138,18 @@ def volatility_impact():
     ))
     print("-" * 60)
     
-    for vol in volatilities:
-        greeks = OptionsGreeks(
-            spot_price=100,
-            strike_price=100,
-            time_to_expiry=0.25,
-            volatility=vol,
-            risk_free_rate=0.05,
-            dividend_yield=0.02
-        )
-        
-        call_greeks = greeks.all_greeks('call')
-        
+    # Price every scenario in one vectorized call, then loop only to print
+    call_greeks = OptionsGreeks.batch_greeks(
+        S=100, K=100, T=0.25, sigma=np.array(volatilities), r=0.05, q=0.02, is_call=True
+    )
+    
+    for i, vol in enumerate(volatilities):
         print("{:<12.0%} {:>11.4f} {:>11.4f} {:>11.4f} {:>11.4f}".format(
             vol,
-            call_greeks['delta'],
-            call_greeks['gamma'],
-            call_greeks['vega'],
-            call_greeks['theta']
+            call_greeks['delta'][i],
+            call_greeks['gamma'][i],
+            call_greeks['vega'][i],
+            call_greeks['theta'][i]
         ))
     
     print("\nKey Observations:")
@@ -178,25 +174,19 @@ def time_decay_example():
     ))
     print("-" * 60)
     
-    for time, label in zip(time_periods, time_labels):
-        greeks = OptionsGreeks(
-            spot_price=100,
-            strike_price=100,
-            time_to_expiry=time,
-            volatility=0.20,
-            risk_free_rate=0.05,
-            dividend_yield=0.02
-        )
-        
-        call_greeks = greeks.all_greeks('call')
-        theta_per_day = call_greeks['theta'] / 365  # Convert annual to daily
-        
+    # Price every expiry in one vectorized call, then loop only to print
+    call_greeks = OptionsGreeks.batch_greeks(
+        S=100, K=100, T=np.array(time_periods), sigma=0.20, r=0.05, q=0.02, is_call=True
+    )
+    theta_per_day = call_greeks['theta'] / 365  # Convert annual to daily
+    
+    for i, label in enumerate(time_labels):
         print("{:<12} {:>11.4f} {:>11.4f} {:>11.4f} {:>11.4f}".format(
             label,
-            call_greeks['delta'],
-            call_greeks['gamma'],
-            call_greeks['vega'],
-            theta_per_day
+            call_greeks['delta'][i],
+            call_greeks['gamma'][i],
+            call_greeks['vega'][i],
+            theta_per_day[i]
         ))
     
     print("\nKey Observations:")
@@ -3,27 +3,149 @@ Example: Paper Trading Simulation
 Demonstrates how to use the paper trading system
 """
 
-from core import PaperTrader, OrderSide, OrderType
-from datetime import datetime
+import sys
+from core import PaperTrader, OrderSide, OrderStatus, OrderType
+from core._numba import njit, prange
+from core.paper_trader.paper_trader import execute_fill
+import numpy as np
+
+# One row per holding in the multi-stock example
+STOCKS_DTYPE = np.dtype([('sym', 'U8'), ('qty', 'i8'), ('px', 'f8')])
+
+# One row per replay event, in time order. kind is MARKET_ORDER (fills at px),
+# LIMIT_ORDER (rests at limit px) or PRICE (new price px for sym); side is
+# 0 for buy and 1 for sell, the trader's own side codes.
+MARKET_ORDER, LIMIT_ORDER, PRICE = 0, 1, 2
+EVENT_DTYPE = np.dtype([('kind', 'i1'), ('side', 'i1'), ('sym', 'i4'),
+                        ('qty', 'f8'), ('px', 'f8')])
+
+# The day trading scenario below as events (symbol 0 is AAPL)
+DAY_EVENTS = np.array([
+    (MARKET_ORDER, 0, 0, 100, 150.00),
+    (PRICE, 0, 0, 0, 152.00),
+    (MARKET_ORDER, 0, 0, 50, 152.00),
+    (LIMIT_ORDER, 1, 0, 150, 155.00),
+    (PRICE, 0, 0, 0, 155.50),
+], dtype=EVENT_DTYPE)
+
+
+class BufferedLog:
+    """Collects output lines and writes them to stdout in one call"""
+    
+    def __init__(self):
+        self.lines = []
+    
+    def line(self, text: str = ""):
+        """Queue one line of output"""
+        self.lines.append(text)
+    
+    def flush(self):
+        """Write all queued lines and clear the buffer"""
+        sys.stdout.write("\n".join(self.lines) + "\n")
+        self.lines.clear()
+
+
+@njit(cache=True)
+def replay(kind: np.ndarray, side: np.ndarray, sym: np.ndarray, qty: np.ndarray,
+           px: np.ndarray, n_syms: int, initial_cash: float, commission: float):
+    """
+    Run an event stream through the paper trader's fill rules
+    
+    Market orders fill at their price; limit orders rest until a price
+    update crosses them and then fill at the limit, in submission order.
+    Fills use the trader's own execute_fill kernel, so cash, positions and
+    rejections match PaperTrader for the same events.
+    
+    Returns:
+        Tuple of (cash, portfolio value, number of trades)
+    """
+    cash = initial_cash
+    pos_qty = np.zeros(n_syms)
+    pos_avg = np.zeros(n_syms)
+    pos_px = np.zeros(n_syms)
+    resting = np.zeros(kind.shape[0], dtype=np.bool_)
+    n_trades = 0
+    for i in range(kind.shape[0]):
+        if kind[i] == LIMIT_ORDER:
+            resting[i] = True
+            continue
+        s = sym[i]
+        if kind[i] == MARKET_ORDER:
+            fills = np.array([i])
+        else:
+            pos_px[s] = px[i]
+            crosses = ((side == 0) & (px[i] <= px)) | ((side == 1) & (px[i] >= px))
+            fills = np.flatnonzero(resting & (sym == s) & crosses)
+        for j in fills:
+            resting[j] = False
+            ok, cash, q, a, p, _ = execute_fill(side[j], qty[j], px[j], commission, cash,
+                                                pos_qty[s], pos_avg[s], pos_px[s])
+            if ok:
+                pos_qty[s], pos_avg[s], pos_px[s] = q, a, p
+                n_trades += 1
+    return cash, cash + (pos_qty * pos_px).sum(), n_trades
+
+
+@njit(parallel=True, cache=True)
+def replay_sweep(kind: np.ndarray, side: np.ndarray, sym: np.ndarray, qty: np.ndarray,
+                 px: np.ndarray, n_syms: int, initial_cash: float,
+                 commissions: np.ndarray) -> np.ndarray:
+    """
+    Replay one event stream once per commission rate, spread across cores
+    
+    Returns:
+        Array of shape (n_rates, 3): cash, portfolio value and trades per rate
+    """
+    out = np.empty((commissions.shape[0], 3))
+    for k in prange(commissions.shape[0]):
+        cash, value, n_trades = replay(kind, side, sym, qty, px, n_syms,
+                                       initial_cash, commissions[k])
+        out[k, 0] = cash
+        out[k, 1] = value
+        out[k, 2] = n_trades
+    return out
+
+
+def sweep_day_commissions():
+    """Replay the day trading scenario under a range of commission rates"""
+    
+    log = BufferedLog()
+    log.line("\n\n" + "="*60)
+    log.line("COMMISSION SWEEP (COMPILED REPLAY)")
+    log.line("="*60)
+    
+    commissions = np.array([0.0, 0.0005, 0.001, 0.002, 0.005])
+    out = replay_sweep(DAY_EVENTS['kind'], DAY_EVENTS['side'], DAY_EVENTS['sym'],
+                       DAY_EVENTS['qty'], DAY_EVENTS['px'], 1, 100000.0, commissions)
+    
+    log.line(f"\n{'Commission':<12} {'Final Value':>14} {'Trades':>8}")
+    log.line("-" * 36)
+    log.line("\n".join(
+        f"{rate:<12.2%} {'$' + format(value, ',.2f'):>14} {n_trades:>8.0f}"
+        for rate, (_, value, n_trades) in zip(commissions.tolist(), out.tolist())
+    ))
+    
+    log.flush()
 
 
 def simulate_day_trading():
     """Simulate a day of paper trading"""
     
-    print("="*60)
-    print("PAPER TRADING SIMULATION")
-    print("="*60)
+    log = BufferedLog()
+    log.line("="*60)
+    log.line("PAPER TRADING SIMULATION")
+    log.line("="*60)
     
     # Initialize paper trader with $100,000
     trader = PaperTrader(initial_capital=100000, commission=0.001)
     
-    print(f"\nStarting Capital: ${trader.cash:,.2f}")
-    print("\nStarting day trading simulation...\n")
+    log.line(f"\nStarting Capital: ${trader.cash:,.2f}")
+    log.line("\nStarting day trading simulation...\n")
     
     # Morning: Buy AAPL
-    print("9:30 AM - Market Opens")
-    print("-" * 40)
-    print("Action: Buy 100 shares of AAPL at $150.00")
+    log.line("9:30 AM - Market Opens")
+    log.line("-" * 40)
+    log.line("Action: Buy 100 shares of AAPL at $150.00")
     
     buy_order = trader.submit_order(
         symbol='AAPL',
@@ -33,24 +155,24 @@ def simulate_day_trading():
     )
     
     trader.execute_order(buy_order, 150.00)
-    print(f"✓ Order executed: {buy_order.order_id}")
+    log.line(f"✓ Order executed: {buy_order.order_id}")
     
     portfolio = trader.get_portfolio_summary()
-    print(f"Cash remaining: ${portfolio['cash']:,.2f}")
-    print(f"Portfolio value: ${portfolio['portfolio_value']:,.2f}")
+    log.line(f"Cash remaining: ${portfolio['cash']:,.2f}")
+    log.line(f"Portfolio value: ${portfolio['portfolio_value']:,.2f}")
     
     # Mid-day: Price goes up, buy more
-    print("\n\n11:00 AM - Price Movement")
-    print("-" * 40)
-    print("AAPL price rises to $152.00")
+    log.line("\n\n11:00 AM - Price Movement")
+    log.line("-" * 40)
+    log.line("AAPL price rises to $152.00")
     
     trader.update_market_data({'AAPL': 152.00})
     portfolio = trader.get_portfolio_summary()
     
-    print(f"Unrealized P&L: ${portfolio['total_pnl']:,.2f}")
-    print(f"Portfolio value: ${portfolio['portfolio_value']:,.2f}")
+    log.line(f"Unrealized P&L: ${portfolio['total_pnl']:,.2f}")
+    log.line(f"Portfolio value: ${portfolio['portfolio_value']:,.2f}")
     
-    print("\nAction: Buy 50 more shares at $152.00")
+    log.line("\nAction: Buy 50 more shares at $152.00")
     buy_order2 = trader.submit_order(
         symbol='AAPL',
         side=OrderSide.BUY,
@@ -59,16 +181,16 @@ def simulate_day_trading():
     )
     
     trader.execute_order(buy_order2, 152.00)
-    print(f"✓ Order executed: {buy_order2.order_id}")
+    log.line(f"✓ Order executed: {buy_order2.order_id}")
     
     # Check position
     position = trader.positions['AAPL']
-    print(f"\nPosition: {position.quantity} shares @ avg ${position.avg_price:.2f}")
+    log.line(f"\nPosition: {position.quantity:g} shares @ avg ${position.avg_price:.2f}")
     
     # Afternoon: Set a limit order to sell
-    print("\n\n2:00 PM - Setting Limit Order")
-    print("-" * 40)
-    print("Action: Place limit order to sell 150 shares at $155.00")
+    log.line("\n\n2:00 PM - Setting Limit Order")
+    log.line("-" * 40)
+    log.line("Action: Place limit order to sell 150 shares at $155.00")
     
     sell_order = trader.submit_order(
         symbol='AAPL',
@@ -78,88 +200,91 @@ def simulate_day_trading():
         price=155.00
     )
     
-    print(f"✓ Limit order placed: {sell_order.order_id}")
-    print("Waiting for price to reach $155.00...")
+    log.line(f"✓ Limit order placed: {sell_order.order_id}")
+    log.line("Waiting for price to reach $155.00...")
     
     # Price hits limit
-    print("\n\n3:30 PM - Limit Order Triggered")
-    print("-" * 40)
-    print("AAPL reaches $155.50")
+    log.line("\n\n3:30 PM - Limit Order Triggered")
+    log.line("-" * 40)
+    log.line("AAPL reaches $155.50")
     
     trader.update_market_data({'AAPL': 155.50})
     
     # Process limit order
     trader.process_limit_order(sell_order, 155.50)
     
-    if sell_order.status.value == 'filled':
-        print(f"✓ Limit order executed at ${sell_order.filled_price:.2f}")
+    if sell_order.status is OrderStatus.FILLED:
+        log.line(f"✓ Limit order executed at ${sell_order.filled_price:.2f}")
     
     # End of day summary
-    print("\n\n4:00 PM - Market Close")
-    print("-" * 40)
+    log.line("\n\n4:00 PM - Market Close")
+    log.line("-" * 40)
     
     final_portfolio = trader.get_portfolio_summary()
     
-    print("\nEND OF DAY SUMMARY")
-    print("="*60)
-    print(f"Cash: ${final_portfolio['cash']:,.2f}")
-    print(f"Portfolio Value: ${final_portfolio['portfolio_value']:,.2f}")
-    print(f"Total P&L: ${final_portfolio['total_pnl']:,.2f}")
-    print(f"Total Return: {final_portfolio['total_return']:.2%}")
-    print(f"\nNumber of Trades: {final_portfolio['num_trades']}")
-    print(f"Open Positions: {final_portfolio['num_positions']}")
+    log.line("\nEND OF DAY SUMMARY")
+    log.line("="*60)
+    log.line(f"Cash: ${final_portfolio['cash']:,.2f}")
+    log.line(f"Portfolio Value: ${final_portfolio['portfolio_value']:,.2f}")
+    log.line(f"Total P&L: ${final_portfolio['total_pnl']:,.2f}")
+    log.line(f"Total Return: {final_portfolio['total_return']:.2%}")
+    log.line(f"\nNumber of Trades: {final_portfolio['num_trades']}")
+    log.line(f"Open Positions: {final_portfolio['num_positions']}")
     
     if final_portfolio['positions']:
-        print("\nCurrent Positions:")
-        for pos in final_portfolio['positions']:
-            print(f"  {pos['symbol']}: {pos['quantity']} shares @ ${pos['avg_price']:.2f}")
-            print(f"    Current Price: ${pos['current_price']:.2f}")
-            print(f"    Unrealized P&L: ${pos['unrealized_pnl']:.2f}")
+        log.line("\nCurrent Positions:")
+        log.line("\n".join(
+            f"  {pos['symbol']}: {pos['quantity']:g} shares @ ${pos['avg_price']:.2f}\n"
+            f"    Current Price: ${pos['current_price']:.2f}\n"
+            f"    Unrealized P&L: ${pos['unrealized_pnl']:.2f}"
+            for pos in final_portfolio['positions']
+        ))
+    
+    log.flush()
 
 
 def simulate_multi_stock_portfolio():
     """Simulate trading multiple stocks"""
     
-    print("\n\n" + "="*60)
-    print("MULTI-STOCK PORTFOLIO SIMULATION")
-    print("="*60)
+    log = BufferedLog()
+    log.line("\n\n" + "="*60)
+    log.line("MULTI-STOCK PORTFOLIO SIMULATION")
+    log.line("="*60)
     
     trader = PaperTrader(initial_capital=100000, commission=0.001)
     
-    print(f"\nStarting Capital: ${trader.cash:,.2f}")
-    print("\nBuilding diversified portfolio...\n")
+    log.line(f"\nStarting Capital: ${trader.cash:,.2f}")
+    log.line("\nBuilding diversified portfolio...\n")
     
-    # Buy multiple stocks
-    stocks = [
+    # Buy multiple stocks, executed together as one batch
+    stocks = np.array([
         ('AAPL', 100, 150.00),
         ('GOOGL', 50, 125.00),
         ('MSFT', 75, 330.00),
         ('AMZN', 30, 145.00),
-    ]
-    
-    for symbol, quantity, price in stocks:
-        print(f"Buying {quantity} shares of {symbol} @ ${price:.2f}")
-        order = trader.submit_order(
-            symbol=symbol,
-            side=OrderSide.BUY,
-            order_type=OrderType.MARKET,
-            quantity=quantity
-        )
-        trader.execute_order(order, price)
-    
-    print("\nInitial Portfolio:")
-    print("-" * 40)
+    ], dtype=STOCKS_DTYPE)
+    
+    log.line("\n".join(
+        f"Buying {quantity} shares of {symbol} @ ${price:.2f}"
+        for symbol, quantity, price in stocks.tolist()
+    ))
+    trader.execute_batch(stocks['sym'], stocks['qty'], stocks['px'], OrderSide.BUY)
+    
+    log.line("\nInitial Portfolio:")
+    log.line("-" * 40)
     portfolio = trader.get_portfolio_summary()
-    for pos in portfolio['positions']:
-        value = pos['quantity'] * pos['current_price']
-        print(f"{pos['symbol']}: {pos['quantity']} shares, Value: ${value:,.2f}")
+    log.line("\n".join(
+        f"{pos['symbol']}: {pos['quantity']:g} shares, "
+        f"Value: ${pos['quantity'] * pos['current_price']:,.2f}"
+        for pos in portfolio['positions']
+    ))
     
-    print(f"\nTotal Invested: ${portfolio['positions_value']:,.2f}")
-    print(f"Cash Remaining: ${portfolio['cash']:,.2f}")
+    log.line(f"\nTotal Invested: ${portfolio['positions_value']:,.2f}")
+    log.line(f"Cash Remaining: ${portfolio['cash']:,.2f}")
     
     # Simulate market movement
-    print("\n\nAfter 1 Week - Market Movement")
-    print("-" * 40)
+    log.line("\n\nAfter 1 Week - Market Movement")
+    log.line("-" * 40)
     
     new_prices = {
         'AAPL': 155.00,   # +3.3%
@@ -168,58 +293,50 @@ def simulate_multi_stock_portfolio():
         'AMZN': 150.00,   # +3.4%
     }
     
-    trader.update_market_data(new_prices)
+    # A feed that already holds arrays skips the per-symbol lookups
+    ids = trader.symbol_ids(list(new_prices))
+    trader.update_market_data_vec(ids, np.fromiter(new_prices.values(), dtype=np.float64))
     
     portfolio = trader.get_portfolio_summary()
-    print("\nUpdated Portfolio:")
-    for pos in portfolio['positions']:
-        pnl = pos['unrealized_pnl']
-        pnl_pct = pos['unrealized_pnl_pct']
-        sign = "+" if pnl >= 0 else ""
-        print(f"{pos['symbol']}: ${pos['current_price']:.2f} ({sign}{pnl_pct:.2%}) | P&L: {sign}${pnl:.2f}")
+    log.line("\nUpdated Portfolio:")
+    log.line("\n".join(
+        f"{pos['symbol']}: ${pos['current_price']:.2f} ({pos['unrealized_pnl_pct']:+.2%}) | "
+        f"P&L: {'+' if pos['unrealized_pnl'] >= 0 else ''}${pos['unrealized_pnl']:.2f}"
+        for pos in portfolio['positions']
+    ))
     
-    print(f"\nTotal Portfolio Value: ${portfolio['portfolio_value']:,.2f}")
-    print(f"Total P&L: ${portfolio['total_pnl']:,.2f} ({portfolio['total_return']:.2%})")
+    log.line(f"\nTotal Portfolio Value: ${portfolio['portfolio_value']:,.2f}")
+    log.line(f"Total P&L: ${portfolio['total_pnl']:,.2f} ({portfolio['total_return']:.2%})")
     
     # Rebalance: Sell losers, keep winners
-    print("\n\nRebalancing Portfolio")
-    print("-" * 40)
-    print("Selling MSFT (down 1.5%) and adding to AAPL (up 3.3%)")
-    
-    # Sell MSFT
-    sell_order = trader.submit_order(
-        symbol='MSFT',
-        side=OrderSide.SELL,
-        order_type=OrderType.MARKET,
-        quantity=75
-    )
-    trader.execute_order(sell_order, new_prices['MSFT'])
+    log.line("\n\nRebalancing Portfolio")
+    log.line("-" * 40)
+    log.line("Selling MSFT (down 1.5%) and adding to AAPL (up 3.3%)")
     
-    # Buy more AAPL
-    buy_order = trader.submit_order(
-        symbol='AAPL',
-        side=OrderSide.BUY,
-        order_type=OrderType.MARKET,
-        quantity=50
-    )
-    trader.execute_order(buy_order, new_prices['AAPL'])
+    # Sell MSFT and buy more AAPL in one batch
+    trader.rebalance({'MSFT': -75, 'AAPL': 50}, new_prices)
     
-    print("\nFinal Portfolio:")
-    print("-" * 40)
+    log.line("\nFinal Portfolio:")
+    log.line("-" * 40)
     final = trader.get_portfolio_summary()
-    for pos in final['positions']:
-        value = pos['quantity'] * pos['current_price']
-        print(f"{pos['symbol']}: {pos['quantity']} shares @ ${pos['current_price']:.2f} = ${value:,.2f}")
+    log.line("\n".join(
+        f"{pos['symbol']}: {pos['quantity']:g} shares @ ${pos['current_price']:.2f} = "
+        f"${pos['quantity'] * pos['current_price']:,.2f}"
+        for pos in final['positions']
+    ))
+    
+    log.line(f"\nCash: ${final['cash']:,.2f}")
+    log.line(f"Portfolio Value: ${final['portfolio_value']:,.2f}")
+    log.line(f"Total Return: {final['total_return']:.2%}")
     
-    print(f"\nCash: ${final['cash']:,.2f}")
-    print(f"Portfolio Value: ${final['portfolio_value']:,.2f}")
-    print(f"Total Return: {final['total_return']:.2%}")
+    log.flush()
 
 
 def run_all_examples():
     """Run all paper trading examples"""
     simulate_day_trading()
     simulate_multi_stock_portfolio()
+    sweep_day_commissions()
     
     print("\n\n" + "="*60)
     print("PAPER TRADING EXAMPLES COMPLETE")
@@ -232,6 +349,7 @@ def run_all_examples():
     print("  ✓ P&L calculation")
     print("  ✓ Multi-stock portfolios")
     print("  ✓ Portfolio rebalancing")
+    print("  ✓ Compiled event replay across commission rates")
     print("\nNext Steps:")
     print("  • Connect to real market data")
     print("  • Implement automated strategies")
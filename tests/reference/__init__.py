@@ -0,0 +1 @@
+"""Original implementations of the core modules, used as test oracles"""
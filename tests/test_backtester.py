@@ -0,0 +1,179 @@
+"""Tests for the backtesting engine, checked against the reference implementation"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import BacktestEngine
+from reference import engine as reference
+
+
+def make_data(seed: int, n: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 2, n))
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                         'volume': 1.0}, index=pd.date_range('2023-01-01', periods=n, freq='D'))
+
+
+def crossover(data: pd.DataFrame, params: dict) -> pd.Series:
+    short = data['close'].rolling(params['short_window']).mean()
+    long = data['close'].rolling(params['long_window']).mean()
+    signals = pd.Series(0, index=data.index)
+    signals[short > long] = 1
+    signals[short < long] = -1
+    return signals
+
+
+class Crossover:
+    """crossover split into a parameter-free precompute step and signals"""
+    
+    def precompute(self, data):
+        return data
+    
+    def signals(self, features, params):
+        return crossover(features, params)
+
+
+def assert_metrics_equal(actual: dict, expected: dict):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float) and math.isnan(value):
+            assert math.isnan(actual[key]), key
+        else:
+            assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+
+def run_both(data, strategy, params, initial_capital=100000.0, commission=0.001):
+    engine = BacktestEngine(initial_capital, commission)
+    ref = reference.BacktestEngine(initial_capital, commission)
+    return (engine, engine.run_backtest(data, strategy, params),
+            ref, ref.run_backtest(data, strategy, params))
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('commission', [0.001, 0.2])
+@pytest.mark.parametrize('windows', [(5, 20), (20, 50)])
+def test_run_backtest_matches_reference(seed, commission, windows):
+    params = {'short_window': windows[0], 'long_window': windows[1]}
+    engine, results, ref, expected = run_both(make_data(seed), crossover, params,
+                                              commission=commission)
+    
+    assert_metrics_equal(results, expected)
+    assert [t.to_dict() for t in engine.trades] == [
+        pytest.approx(t.to_dict()) for t in ref.trades
+    ]
+    assert ([e['timestamp'] for e in engine.equity_curve]
+            == [e['timestamp'] for e in ref.equity_curve])
+    np.testing.assert_allclose([e['equity'] for e in engine.equity_curve],
+                               [e['equity'] for e in ref.equity_curve], rtol=1e-12)
+    np.testing.assert_allclose([e['capital'] for e in engine.equity_curve],
+                               [e['capital'] for e in ref.equity_curve], rtol=1e-12)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_signals_shorter_than_data_hold_for_the_rest(seed):
+    rng = np.random.default_rng(seed)
+    signals = pd.Series(rng.choice([-1, 0, 1], size=50))
+    engine, results, ref, expected = run_both(make_data(seed), lambda d, p: signals, {},
+                                              initial_capital=1000.0)
+    
+    assert_metrics_equal(results, expected)
+    assert len(engine.trades) == len(ref.trades)
+
+
+def test_no_trades():
+    engine, results, ref, expected = run_both(make_data(0),
+                                              lambda d, p: pd.Series(0, index=d.index), {})
+    
+    assert_metrics_equal(results, expected)
+    assert engine.trades == []
+
+
+def test_precomputable_strategy_matches_function():
+    data = make_data(1)
+    params = {'short_window': 10, 'long_window': 30}
+    
+    assert_metrics_equal(BacktestEngine().run_backtest(data, Crossover(), params),
+                         BacktestEngine().run_backtest(data, crossover, params))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_evaluate_matches_run_backtest(seed):
+    data = make_data(seed)
+    params = {'short_window': 5, 'long_window': 20}
+    engine = BacktestEngine()
+    expected = engine.run_backtest(data, crossover, params)
+    
+    results = BacktestEngine().evaluate(data['close'].to_numpy(),
+                                        crossover(data, params).to_numpy())
+    
+    assert_metrics_equal(results, expected)
+
+
+def test_equity_sampling_keeps_every_nth_bar():
+    data = make_data(2)
+    params = {'short_window': 5, 'long_window': 20}
+    full = BacktestEngine()
+    full.run_backtest(data, crossover, params)
+    sampled = BacktestEngine()
+    sampled.run_backtest(data, crossover, params, equity_sampling=7)
+    skipped = BacktestEngine()
+    metrics = skipped.run_backtest(data, crossover, params, record_equity=False)
+    
+    assert sampled.equity_curve == full.equity_curve[::7]
+    assert skipped.equity_curve == []
+    assert metrics['max_drawdown'] == pytest.approx(
+        reference_drawdown([e['equity'] for e in full.equity_curve]))
+    with pytest.raises(ValueError):
+        BacktestEngine().run_backtest(data, crossover, params, equity_sampling=0)
+
+
+def reference_drawdown(equity):
+    ref = reference.BacktestEngine()
+    ref.equity_curve = [{'equity': value} for value in equity]
+    return ref._calculate_max_drawdown()
+
+
+def falling_data(n: int = 100) -> pd.DataFrame:
+    close = np.linspace(100.0, 40.0, n)
+    return pd.DataFrame({'close': close}, index=pd.date_range('2023-01-01', periods=n, freq='D'))
+
+
+def always_long(data, params):
+    return pd.Series(1, index=data.index)
+
+
+def test_early_stop_prunes_run_once_account_value_falls_below_ratio():
+    data = falling_data()
+    engine = BacktestEngine(100000, 0.0)
+    results = engine.run_backtest(data, always_long, {}, early_stop_equity_ratio=0.8)
+    
+    assert results['pruned'] is True
+    for key in ('total_return', 'win_rate', 'avg_win', 'avg_loss', 'profit_factor',
+                'final_capital'):
+        assert math.isnan(results[key]), key
+    # The equity curve ends at the first bar whose account value is below the floor
+    close = data['close'].to_numpy()
+    quantity = int(100000 * 0.95 / close[0])
+    value = 100000 - quantity * close[0] + quantity * close
+    stop = int(np.flatnonzero(value < 80000)[0])
+    assert len(engine.equity_curve) == stop + 1
+    assert engine.trades == []
+    
+    evaluated = BacktestEngine(100000, 0.0).evaluate(close, always_long(data, {}).to_numpy(),
+                                                     early_stop_equity_ratio=0.8)
+    assert evaluated['pruned'] is True
+    assert math.isnan(evaluated['total_return'])
+
+
+def test_early_stop_never_fires_above_the_floor():
+    data = falling_data()
+    expected = BacktestEngine(100000, 0.0).run_backtest(data, always_long, {})
+    
+    results = BacktestEngine(100000, 0.0).run_backtest(data, always_long, {},
+                                                       early_stop_equity_ratio=0.1)
+    
+    assert 'pruned' not in results
+    assert_metrics_equal(results, expected)
@@ -0,0 +1,89 @@
+"""Tests for the options Greeks calculator, checked against the reference implementation"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from core import OptionsGreeks
+from reference import options_greeks as reference
+
+GREEKS = ('delta', 'gamma', 'vega', 'theta', 'rho')
+
+CASES = list(itertools.product(
+    [50.0, 90.0, 100.0, 130.0],   # spot
+    [0.01, 0.25, 2.0],            # time to expiry
+    [0.05, 0.3],                  # volatility
+    ['call', 'put']
+))
+
+
+@pytest.mark.parametrize('spot, expiry, vol, option_type', CASES)
+def test_all_greeks_match_reference(spot, expiry, vol, option_type):
+    args = (spot, 100.0, expiry, vol, 0.05, 0.02)
+    
+    greeks = OptionsGreeks(*args).all_greeks(option_type)
+    expected = reference.OptionsGreeks(*args).all_greeks(option_type)
+    
+    assert greeks.keys() == expected.keys()
+    for name in GREEKS:
+        assert greeks[name] == pytest.approx(expected[name], rel=1e-9, abs=1e-12), name
+
+
+@pytest.mark.parametrize('spot, expiry, vol, option_type', CASES)
+def test_single_greeks_match_reference(spot, expiry, vol, option_type):
+    args = (spot, 100.0, expiry, vol, 0.05, 0.02)
+    greeks = OptionsGreeks(*args)
+    expected = reference.OptionsGreeks(*args)
+    
+    assert greeks.delta(option_type) == pytest.approx(expected.delta(option_type), rel=1e-12)
+    assert greeks.gamma() == pytest.approx(expected.gamma(), rel=1e-12)
+    assert greeks.vega() == pytest.approx(expected.vega(), rel=1e-12)
+    assert greeks.theta(option_type) == pytest.approx(expected.theta(option_type), rel=1e-12)
+    assert greeks.rho(option_type) == pytest.approx(expected.rho(option_type), rel=1e-12)
+
+
+def test_cached_terms_follow_changed_inputs():
+    greeks = OptionsGreeks(100.0, 100.0, 0.25, 0.2, 0.05, 0.02)
+    greeks.delta()
+    greeks.S = 120.0
+    
+    assert greeks.delta() == pytest.approx(
+        reference.OptionsGreeks(120.0, 100.0, 0.25, 0.2, 0.05, 0.02).delta(), rel=1e-12)
+
+
+def test_batch_greeks_match_all_greeks():
+    spots, expiries, vols, types = zip(*CASES)
+    is_call = np.array([t == 'call' for t in types])
+    
+    batch = OptionsGreeks.batch_greeks(S=np.array(spots), K=100.0, T=np.array(expiries),
+                                       sigma=np.array(vols), r=0.05, q=0.02, is_call=is_call)
+    
+    for i, (spot, expiry, vol, option_type) in enumerate(CASES):
+        expected = reference.OptionsGreeks(spot, 100.0, expiry, vol, 0.05, 0.02).all_greeks(
+            option_type)
+        for name in GREEKS:
+            assert batch[name][i] == pytest.approx(expected[name], rel=1e-9, abs=1e-12), name
+
+
+def test_batch_greeks_broadcasts_scalars_against_arrays():
+    strikes = np.array([80.0, 100.0, 120.0])
+    
+    batch = OptionsGreeks.batch_greeks(S=100.0, K=strikes, T=0.5, sigma=0.25, r=0.05, is_call=False)
+    
+    for name in GREEKS:
+        assert batch[name].shape == strikes.shape
+    for i, strike in enumerate(strikes):
+        expected = reference.OptionsGreeks(100.0, strike, 0.5, 0.25, 0.05).all_greeks('put')
+        for name in GREEKS:
+            assert batch[name][i] == pytest.approx(expected[name], rel=1e-9, abs=1e-12), name
+
+
+@pytest.mark.parametrize('spot, strike', [(0.0, 100.0), (-5.0, 100.0), (100.0, 0.0), (100.0, -5.0)])
+def test_non_positive_spot_or_strike_fails_like_reference(spot, strike):
+    args = (spot, strike, 0.5, 0.2, 0.05)
+    with pytest.raises(Exception) as expected:
+        reference.OptionsGreeks(*args).all_greeks()
+    
+    with pytest.raises(expected.type, match=str(expected.value)):
+        OptionsGreeks(*args).all_greeks()
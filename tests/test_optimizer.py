@@ -0,0 +1,145 @@
+"""Tests for the strategy optimizer, checked against the reference backtester"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import BacktestEngine, StrategyOptimizer
+from reference import engine as reference
+
+GRID = {'short_window': [5, 10], 'long_window': [20, 30]}
+
+
+def make_data(seed: int, n: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 2, n))
+    return pd.DataFrame({'close': close}, index=pd.date_range('2023-01-01', periods=n, freq='D'))
+
+
+def crossover(data: pd.DataFrame, params: dict) -> pd.Series:
+    short = data['close'].rolling(int(params['short_window'])).mean()
+    long = data['close'].rolling(int(params['long_window'])).mean()
+    signals = pd.Series(0, index=data.index)
+    signals[short > long] = 1
+    signals[short < long] = -1
+    return signals
+
+
+def reference_return(data, params):
+    results = reference.BacktestEngine(100000, 0.001).run_backtest(data, crossover, params)
+    return results['total_return']
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_grid_search_matches_reference_runs(seed):
+    data = make_data(seed)
+    optimizer = StrategyOptimizer(BacktestEngine(100000, 0.001), data)
+    
+    result = optimizer.grid_search(crossover, GRID)
+    
+    returns = [r['total_return'] for r in result['all_results']]
+    expected = [reference_return(data, r['params']) for r in result['all_results']]
+    assert len(returns) == 4
+    assert returns == pytest.approx(expected, rel=1e-9, abs=1e-12)
+    assert result['best_metric'] == max(returns)
+    assert result['best_results']['params'] == result['best_params']
+
+
+def test_grid_search_in_worker_processes_matches_serial():
+    pytest.importorskip('joblib')
+    data = make_data(0)
+    
+    serial = StrategyOptimizer(BacktestEngine(), data).grid_search(crossover, GRID)
+    parallel = StrategyOptimizer(BacktestEngine(), data).grid_search(crossover, GRID, n_jobs=2)
+    
+    assert parallel['best_params'] == serial['best_params']
+    assert [r['total_return'] for r in parallel['all_results']] == pytest.approx(
+        [r['total_return'] for r in serial['all_results']])
+
+
+def test_grid_search_persists_all_results_once():
+    calls = []
+    result = StrategyOptimizer(BacktestEngine(), make_data(1)).grid_search(
+        crossover, GRID, persist_fn=calls.append)
+    
+    assert calls == [result['all_results']]
+
+
+def test_grid_search_never_picks_a_pruned_run():
+    n = 200
+    close = np.concatenate([np.linspace(100, 40, n // 2), np.linspace(40, 120, n // 2)])
+    data = pd.DataFrame({'close': close}, index=pd.date_range('2023-01-01', periods=n, freq='D'))
+    
+    def strategy(data, params):
+        # Enter on the first bar or once the fall is over
+        signals = pd.Series(0, index=data.index)
+        signals.iloc[params['entry']] = 1
+        return signals
+    
+    result = StrategyOptimizer(BacktestEngine(100000, 0.0), data).grid_search(
+        strategy, {'entry': [0, n // 2]}, early_stop_equity_ratio=0.8)
+    
+    pruned = [r for r in result['all_results'] if r.get('pruned')]
+    assert [r['params'] for r in pruned] == [{'entry': 0}]
+    assert math.isnan(pruned[0]['total_return'])
+    assert result['best_params'] == {'entry': n // 2}
+
+
+def test_bayesian_search_reports_its_best_call():
+    pytest.importorskip('skopt')
+    data = make_data(2)
+    ranges = {'short_window': (3, 15), 'long_window': (20, 40)}
+    
+    result = StrategyOptimizer(BacktestEngine(100000, 0.001), data).bayesian_search(
+        crossover, ranges, n_calls=12, random_state=0)
+    
+    assert len(result['history']) == 12
+    assert result['best_metric'] == pytest.approx(max(result['history']))
+    best = result['best_params']
+    for name, (low, high) in ranges.items():
+        assert isinstance(best[name], int) and low <= best[name] <= high
+    assert result['best_results']['params'] == best
+    assert result['best_metric'] == pytest.approx(reference_return(data, best), rel=1e-9)
+
+
+class FeedCheckingOptimizer(StrategyOptimizer):
+    """Records whether each run found the feed already built"""
+    
+    def _run_one(self, strategy, params, *args):
+        prebuilt = self._feed is not None
+        params, results, error = super()._run_one(strategy, params, *args)
+        if results is not None:
+            results['feed_prebuilt'] = prebuilt
+        return params, results, error
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_runs_receive_a_prebuilt_feed(n_jobs):
+    if n_jobs != 1:
+        pytest.importorskip('joblib')
+    result = FeedCheckingOptimizer(BacktestEngine(), make_data(0)).grid_search(
+        crossover, GRID, n_jobs=n_jobs)
+    
+    assert [r['feed_prebuilt'] for r in result['all_results']] == [True] * 4
+
+
+class DoubledReturnEngine(BacktestEngine):
+    """Customised engine whose results the optimizer must report"""
+    
+    def run_backtest(self, *args, **kwargs):
+        results = super().run_backtest(*args, **kwargs)
+        results['total_return'] *= 2
+        return results
+
+
+def test_grid_search_runs_the_callers_engine_class():
+    data = make_data(0)
+    engine = DoubledReturnEngine(50000, 0.001)
+    
+    result = StrategyOptimizer(engine, data).grid_search(crossover, GRID)
+    
+    for r in result['all_results']:
+        expected = reference.BacktestEngine(50000, 0.001).run_backtest(data, crossover, r['params'])
+        assert r['total_return'] == pytest.approx(2 * expected['total_return'], rel=1e-9)
@@ -0,0 +1,404 @@
+"""Tests for the paper trading engine, checked against the reference implementation"""
+
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from core import PaperTrader, OrderSide, OrderStatus, OrderType
+from core.paper_trader import paper_trader as pt
+from core.paper_trader.paper_trader import LimitIndex
+from reference import paper_trader as reference
+
+SYMBOLS = ['AAPL', 'MSFT', 'GOOG', 'AMZN', 'TSLA', 'NVDA']
+
+
+def buy(trader, symbol, quantity, price):
+    order = trader.submit_order(symbol, OrderSide.BUY, OrderType.MARKET, quantity)
+    assert trader.execute_order(order, price)
+    return order
+
+
+def test_portfolio_value_recovers_after_nan_price():
+    trader = PaperTrader(initial_capital=2000, commission=0.0)
+    buy(trader, 'A', 10, 100.0)
+    
+    trader.update_market_data({'A': float('nan')})
+    assert math.isnan(trader.get_portfolio_value())
+    
+    trader.update_market_data({'A': 101.0})
+    assert trader.get_portfolio_value() == 2010.0
+    assert trader.get_portfolio_summary()['positions_value'] == 1010.0
+
+
+def test_update_market_data_vec_repeated_slot_takes_last_price():
+    trader = PaperTrader(initial_capital=2000, commission=0.0)
+    buy(trader, 'A', 10, 100.0)
+    
+    trader.update_market_data_vec(trader.symbol_ids(['A', 'A']), [110.0, 120.0])
+    
+    summary = trader.get_portfolio_summary()
+    assert summary['positions_value'] == 1200.0
+    assert summary['positions'][0]['market_value'] == 1200.0
+    assert trader.positions['A'].current_price == 120.0
+
+
+def test_execute_order_accepts_aware_fill_time():
+    trader = PaperTrader(initial_capital=100000, commission=0.01)
+    order = trader.submit_order('A', OrderSide.BUY, OrderType.MARKET, 10)
+    now = datetime(2024, 1, 2, 15, 30, tzinfo=timezone(timedelta(hours=-5)))
+    
+    assert trader.execute_order(order, 100.0, now=now)
+    
+    assert order.filled_at == datetime(2024, 1, 2, 20, 30)
+    assert trader.trade_history[0]['timestamp'] == '2024-01-02T20:30:00'
+
+
+def test_invalid_fill_time_leaves_state_untouched():
+    trader = PaperTrader(initial_capital=100000, commission=0.01)
+    order = trader.submit_order('A', OrderSide.BUY, OrderType.MARKET, 10)
+    
+    with pytest.raises(TypeError):
+        trader.execute_order(order, 100.0, now='2024-01-02')
+    with pytest.raises(TypeError):
+        trader.execute_batch(['A'], [10], [100.0], now=1704200000)
+    
+    assert trader.cash == 100000
+    assert order.status is OrderStatus.PENDING
+    assert trader.positions == {}
+    assert trader.trade_history == []
+    assert len(trader.orders) == 1
+
+
+def test_summary_records_are_not_shared_between_calls():
+    trader = PaperTrader(initial_capital=100000, commission=0.0)
+    buy(trader, 'A', 10, 100.0)
+    
+    trader.get_portfolio_summary()['positions'][0]['quantity'] = 999
+    
+    assert trader.get_portfolio_summary()['positions'][0]['quantity'] == 10
+
+
+@pytest.mark.parametrize('order_type, price', [(OrderType.MARKET, None), (OrderType.LIMIT, 105.0)])
+def test_order_cancelled_through_status_field_does_not_fill(order_type, price):
+    trader = PaperTrader(initial_capital=100000, commission=0.0)
+    buy(trader, 'A', 10, 100.0)
+    order = trader.submit_order('A', OrderSide.SELL, order_type, 10, price)
+    
+    order.status = OrderStatus.CANCELLED
+    trader.update_market_data({'A': 110.0})
+    
+    assert order.status is OrderStatus.CANCELLED
+    assert trader.positions['A'].quantity == 10
+    assert len(trader.trade_history) == 1
+
+
+def sell(trader, symbol, quantity, price):
+    order = trader.submit_order(symbol, OrderSide.SELL, OrderType.MARKET, quantity)
+    assert trader.execute_order(order, price)
+    return order
+
+
+def test_positions_keep_the_order_they_were_opened_in():
+    trader = PaperTrader(initial_capital=100000, commission=0.0)
+    buy(trader, 'A', 10, 100.0)
+    buy(trader, 'B', 10, 50.0)
+    sell(trader, 'A', 10, 101.0)
+    buy(trader, 'A', 5, 102.0)
+    
+    assert list(trader.positions) == ['B', 'A']
+    assert [p['symbol'] for p in trader.get_portfolio_summary()['positions']] == ['B', 'A']
+
+
+def test_integer_quantities_are_reported_as_int():
+    trader = PaperTrader(initial_capital=100000, commission=0.0)
+    buy(trader, 'A', 10, 100.0)
+    buy(trader, 'B', 2.5, 50.0)
+    trader.execute_batch(['A', 'C'], [5, 7], [101.0, 20.0])
+    
+    quantities = {p['symbol']: p['quantity'] for p in trader.get_portfolio_summary()['positions']}
+    assert quantities == {'A': 15, 'B': 2.5, 'C': 7}
+    assert type(quantities['A']) is int and type(quantities['C']) is int
+    assert type(trader.positions['A'].quantity) is int
+    assert [type(t['quantity']) for t in trader.trade_history] == [int, float, int, int]
+    
+    buy(trader, 'A', 0.5, 100.0)
+    assert trader.positions['A'].quantity == 15.5
+
+
+def same(actual, expected):
+    """Equal values of the same type, with floats compared to rounding error"""
+    if isinstance(expected, float) and isinstance(actual, float):
+        return (math.isnan(actual) and math.isnan(expected)) or math.isclose(
+            actual, expected, rel_tol=1e-9, abs_tol=1e-6)
+    if isinstance(expected, dict):
+        return actual.keys() == expected.keys() and all(same(actual[k], expected[k])
+                                                        for k in expected)
+    if isinstance(expected, list):
+        return len(actual) == len(expected) and all(same(a, e) for a, e in zip(actual, expected))
+    return type(actual) is type(expected) and actual == expected
+
+
+def without_times(record):
+    return {k: v for k, v in record.items()
+            if k not in ('timestamp', 'order_id', 'created_at', 'filled_at')}
+
+
+def run_session(module, seed, steps=200):
+    """Drive a PaperTrader from module through a random but repeatable session"""
+    rng = random.Random(seed)
+    trader = module.PaperTrader(rng.choice([10000.0, 100000.0]), rng.choice([0.0, 0.001, 0.01]))
+    orders = []
+    prices = {s: rng.uniform(50, 300) for s in SYMBOLS}
+    results = []
+    for _ in range(steps):
+        op = rng.random()
+        if op < 0.35:
+            symbol = rng.choice(SYMBOLS)
+            order_type = rng.choice(['MARKET', 'LIMIT', 'LIMIT', 'STOP'])
+            price = None
+            if order_type == 'LIMIT' and rng.random() < 0.9:
+                price = round(prices[symbol] * rng.uniform(0.97, 1.03), 2)
+            order = trader.submit_order(symbol, module.OrderSide[rng.choice(['BUY', 'SELL'])],
+                                        module.OrderType[order_type],
+                                        rng.choice([1, 5, 10, 50, 100, 2.5]), price)
+            orders.append(order)
+            if order_type == 'MARKET' and rng.random() < 0.5:
+                results.append(trader.execute_order(order, prices[symbol]))
+        elif op < 0.7:
+            update = {s: prices[s] * rng.uniform(0.97, 1.03)
+                      for s in rng.sample(SYMBOLS, rng.randint(1, len(SYMBOLS)))}
+            prices.update(update)
+            if rng.random() < 0.1:
+                update['UNKNOWN'] = 10.0
+            trader.update_market_data(update)
+        elif op < 0.8 and orders:
+            results.append(trader.cancel_order(rng.choice(orders).order_id))
+        elif op < 0.9 and orders:
+            order = rng.choice(orders)
+            results.append(trader.process_limit_order(order, prices[order.symbol]))
+        elif orders:
+            order = rng.choice(orders)
+            results.append(trader.execute_order(order, prices[order.symbol]))
+        results.append((trader.cash, trader.get_portfolio_value()))
+    
+    summary = trader.get_portfolio_summary()
+    summary['positions'] = [without_times(p) for p in summary['positions']]
+    return {
+        'results': [list(r) if isinstance(r, tuple) else r for r in results],
+        'orders': [without_times(o.to_dict()) for o in orders],
+        'summary': summary,
+        'trades': [without_times(t) for t in trader.trade_history],
+        'positions': {s: p.to_dict() for s, p in trader.positions.items()},
+        'position_order': list(trader.positions)
+    }
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_session_matches_reference(seed):
+    actual = run_session(pt, seed)
+    expected = run_session(reference, seed)
+    
+    for key in expected:
+        assert same(actual[key], expected[key]), key
+
+
+def trade_state(trader):
+    summary = trader.get_portfolio_summary()
+    return {
+        'summary': summary,
+        'orders': [without_times(o.to_dict()) for o in trader.orders],
+        'trades': [without_times(t) for t in trader.trade_history]
+    }
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_execute_batch_matches_sequential_orders(seed):
+    rng = random.Random(seed)
+    capital = rng.choice([1000.0, 10000.0, 100000.0])
+    sequential = PaperTrader(capital, 0.001)
+    batched = PaperTrader(capital, 0.001)
+    for _ in range(4):
+        m = rng.randint(0, 12)
+        symbols = [rng.choice('ABCD') for _ in range(m)]
+        quantities = [rng.choice([1, 5, 10, 50, 2.5]) for _ in range(m)]
+        prices = [round(rng.uniform(10, 300), 2) for _ in range(m)]
+        sides = [rng.choice([OrderSide.BUY, OrderSide.SELL]) for _ in range(m)]
+        for symbol, quantity, price, side in zip(symbols, quantities, prices, sides):
+            sequential.execute_order(
+                sequential.submit_order(symbol, side, OrderType.MARKET, quantity), price)
+        batched.execute_batch(symbols, quantities, prices, sides)
+        
+        assert same(trade_state(batched), trade_state(sequential))
+
+
+def test_execute_batch_accepts_arrays():
+    trader = PaperTrader(100000, 0.001)
+    
+    orders = trader.execute_batch(np.array(['A', 'B']), np.array([10, 20]), np.array([100.0, 50.0]))
+    
+    assert [o.status for o in orders] == [OrderStatus.FILLED, OrderStatus.FILLED]
+    assert list(trader.positions) == ['A', 'B']
+    assert type(trader.positions['A'].symbol) is str
+
+
+@pytest.mark.parametrize('quantities, prices, side', [
+    ([10], [100.0, 50.0], OrderSide.BUY),
+    ([10, 20], [100.0], OrderSide.BUY),
+    ([10, 20], [100.0, 50.0], [OrderSide.BUY]),
+])
+def test_execute_batch_rejects_mismatched_lengths_before_touching_state(quantities, prices, side):
+    trader = PaperTrader(100000, 0.001)
+    
+    with pytest.raises(ValueError):
+        trader.execute_batch(['A', 'B'], quantities, prices, side)
+    
+    assert trader._book.sym_idx == {}
+    assert trader.cash == 100000
+    assert trader.orders == []
+    assert trader.trade_history == []
+
+
+def test_rebalance_sells_before_buying():
+    trader = PaperTrader(10000, 0.0)
+    buy(trader, 'A', 90, 100.0)
+    
+    # Buying B needs the proceeds from selling A first
+    orders = trader.rebalance({'B': 40, 'A': -90, 'C': 0}, {'A': 110.0, 'B': 100.0, 'C': 1.0})
+    
+    assert [(o.symbol, o.side, o.quantity) for o in orders] == [
+        ('A', OrderSide.SELL, 90), ('B', OrderSide.BUY, 40)]
+    assert all(o.status is OrderStatus.FILLED for o in orders)
+    assert list(trader.positions) == ['B']
+    assert trader.cash == pytest.approx(10000 - 9000 + 9900 - 4000)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_update_market_data_vec_matches_dict_updates(seed):
+    rng = random.Random(seed)
+    by_dict = PaperTrader(100000, 0.001)
+    by_array = PaperTrader(100000, 0.001)
+    for trader in (by_dict, by_array):
+        trader.execute_batch(SYMBOLS[:4], [10, 20, 30, 40], [100.0, 200.0, 50.0, 80.0])
+    for symbol in SYMBOLS[:4]:
+        limit = round(rng.uniform(40, 220), 2)
+        side = rng.choice([OrderSide.BUY, OrderSide.SELL])
+        for trader in (by_dict, by_array):
+            trader.submit_order(symbol, side, OrderType.LIMIT, 5, limit)
+    
+    for _ in range(10):
+        update = {s: rng.uniform(40, 220) for s in rng.sample(SYMBOLS[:4], 3)}
+        by_dict.update_market_data(update)
+        by_array.update_market_data_vec(by_array.symbol_ids(list(update)),
+                                        np.fromiter(update.values(), dtype=np.float64))
+        
+        assert same(trade_state(by_array), trade_state(by_dict))
+
+
+def test_limit_index_returns_crossed_orders_once():
+    index = LimitIndex()
+    index.add(0, pt._BUY, 100.0, 1)
+    index.add(0, pt._BUY, 95.0, 2)
+    index.add(0, pt._SELL, 105.0, 3)
+    index.add(0, pt._SELL, 110.0, 4)
+    index.add(1, pt._BUY, 100.0, 5)
+    
+    assert index.triggered(0, float('nan')) == []
+    assert index.triggered(0, 102.0) == []
+    assert sorted(index.triggered(0, 97.0)) == [1]
+    assert sorted(index.triggered(0, 108.0)) == [3]
+    
+    index.remove(0, pt._BUY, 95.0, 2)
+    assert index.triggered(0, 90.0) == []
+    assert index.triggered(0, 120.0) == [4]
+    assert index.triggered(1, 99.0) == [5]
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_to_json_round_trips_summary_and_trades(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(pt, 'orjson', None)
+    trader = PaperTrader(100000, 0.001)
+    buy(trader, 'A', 10, 100.0)
+    trader.update_market_data({'A': 105.0})
+    
+    document = json.loads(trader.to_json())
+    
+    assert document == {'summary': trader.get_portfolio_summary(), 'trades': trader.trade_history}
+
+
+def random_book(rng, n_syms=5, m=40):
+    return dict(
+        prices=rng.uniform(50, 150, n_syms),
+        has_price=rng.random(n_syms) < 0.7,
+        order_type=rng.integers(0, 4, m).astype(np.int8),
+        side=rng.integers(0, 2, m).astype(np.int8),
+        limit_px=np.where(rng.random(m) < 0.1, np.nan, rng.uniform(50, 150, m)),
+        status=rng.integers(0, 4, m).astype(np.int8),
+        symbol_idx=rng.integers(0, n_syms, m).astype(np.int64),
+    )
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_numpy_matcher_agrees_with_kernel(seed):
+    book = random_book(np.random.default_rng(seed))
+    
+    fill, fill_px = pt.match_pending(**book)
+    fill_np, fill_px_np = pt._match_pending_masks(**book)
+    
+    np.testing.assert_array_equal(fill, fill_np)
+    np.testing.assert_array_equal(fill_px, fill_px_np)
+
+
+def test_aot_kernels_agree_with_jit_kernels():
+    aot = pytest.importorskip('core.paper_trader.paper_kernels')
+    rng = np.random.default_rng(0)
+    book = random_book(rng)
+    for actual, expected in zip(aot.match_pending(*book.values()), pt.match_pending(**book)):
+        np.testing.assert_array_equal(actual, expected)
+    
+    qty, avg, px = rng.uniform(0, 10, 6), rng.uniform(50, 150, 6), rng.uniform(50, 150, 6)
+    for actual, expected in zip(aot.summarize_positions(qty, avg, px),
+                                pt.summarize_positions(qty, avg, px)):
+        np.testing.assert_array_equal(actual, expected)
+    
+    assert aot.execute_fill(0, 10.0, 100.0, 0.001, 5000.0, 0.0, 0.0, 0.0) == \
+        pt.execute_fill(0, 10.0, 100.0, 0.001, 5000.0, 0.0, 0.0, 0.0)
+
+
+FALLBACK_SCRIPT = """
+import json, sys
+sys.path[:0] = [{root!r}, {tests!r}]
+sys.modules['core.paper_trader.paper_kernels'] = None
+{block_numba}
+from core.paper_trader import paper_trader as pt
+assert pt._execute_fill is pt.execute_fill
+assert pt._match_pending is ({matcher})
+from test_paper_trader import run_session
+print(json.dumps(run_session(pt, 3)))
+"""
+
+
+@pytest.mark.parametrize('without_numba', [False, True])
+def test_kernel_fallbacks_match_reference(without_numba):
+    tests = os.path.dirname(os.path.abspath(__file__))
+    script = FALLBACK_SCRIPT.format(
+        root=os.path.dirname(tests), tests=tests,
+        block_numba="sys.modules['numba'] = None" if without_numba else "",
+        matcher='pt._match_pending_masks' if without_numba else 'pt.match_pending')
+    
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                         check=True).stdout
+    
+    expected = json.loads(json.dumps(run_session(reference, 3)))
+    actual = json.loads(out)
+    for key in expected:
+        assert same(actual[key], expected[key]), key